@@ -25,6 +25,7 @@ if config.config_file_name is not None:
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
 from server.db import Base
+from server.db import models  # noqa: F401  registers every table on Base.metadata
 from server.core.config import DATABASE_DSN
 
 target_metadata = Base.metadata
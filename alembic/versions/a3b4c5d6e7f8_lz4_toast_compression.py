@@ -0,0 +1,53 @@
+"""Use lz4 TOAST compression for large text columns
+
+Only values written after this migration are compressed with lz4;
+existing rows keep pglz until they are rewritten.
+
+Revision ID: a3b4c5d6e7f8
+Revises: f2a3b4c5d6e7
+Create Date: 2026-01-15
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a3b4c5d6e7f8'
+down_revision = 'f2a3b4c5d6e7'
+branch_labels = None
+depends_on = None
+
+
+_COLUMNS = [
+    ('run_steps', 'logs'),
+    ('runs', 'error'),
+    ('project_files', 'summary_text'),
+    ('run_versions', 'markdown'),
+    ('run_versions', 'regen_context'),
+]
+
+
+def _lz4_available() -> bool:
+    # Requires PostgreSQL 14+ built with lz4; the setting only lists methods the server supports
+    row = op.get_bind().execute(
+        sa.text(
+            "SELECT 'lz4' = ANY(enumvals) FROM pg_settings "
+            "WHERE name = 'default_toast_compression'"
+        )
+    ).scalar()
+    return bool(row)
+
+
+def upgrade() -> None:
+    if not _lz4_available():
+        print("[WARN] Server does not support lz4 TOAST compression; skipping")
+        return
+    for table, column in _COLUMNS:
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} SET COMPRESSION lz4')
+
+
+def downgrade() -> None:
+    if not _lz4_available():
+        return
+    for table, column in _COLUMNS:
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} SET COMPRESSION DEFAULT')
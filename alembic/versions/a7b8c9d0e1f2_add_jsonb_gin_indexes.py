@@ -0,0 +1,38 @@
+"""Add GIN index on scope_embeddings.metadata for containment lookups
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6g7h8i9j0k1
+Create Date: 2026-01-12
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'a7b8c9d0e1f2'
+down_revision = 'f6g7h8i9j0k1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_scope_embeddings_metadata_gin',
+            'scope_embeddings',
+            ['metadata'],
+            postgresql_using='gin',
+            postgresql_ops={'metadata': 'jsonb_path_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_scope_embeddings_metadata_gin',
+            table_name='scope_embeddings',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
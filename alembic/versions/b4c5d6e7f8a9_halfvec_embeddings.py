@@ -0,0 +1,70 @@
+"""Store embeddings as halfvec
+
+Half precision halves the bytes the HNSW distance kernel reads per
+candidate. Requires pgvector 0.7+ on the server.
+
+Revision ID: b4c5d6e7f8a9
+Revises: a3b4c5d6e7f8
+Create Date: 2026-01-15
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b4c5d6e7f8a9'
+down_revision = 'a3b4c5d6e7f8'
+branch_labels = None
+depends_on = None
+
+
+def _embedding_dimensions() -> int:
+    # vector and halfvec both store the declared dimension as the typmod
+    typmod = op.get_bind().execute(
+        sa.text(
+            "SELECT atttypmod FROM pg_attribute "
+            "WHERE attrelid = 'scope_embeddings'::regclass AND attname = 'embedding'"
+        )
+    ).scalar()
+    return typmod if typmod is not None and typmod > 0 else 0
+
+
+# Widest column pgvector will build an HNSW index on, per type
+_MAX_INDEXED_DIMENSIONS = {'vector': 2000, 'halfvec': 4000}
+
+
+def _convert(target_type: str, ops: str) -> None:
+    dim = _embedding_dimensions()
+    if not dim:
+        print("[WARN] scope_embeddings.embedding has no fixed dimension; skipping conversion")
+        return
+    # The column rewrite would rebuild the index anyway; drop it first and
+    # build the new one concurrently afterwards.
+    op.drop_index('ix_scope_embeddings_hnsw', table_name='scope_embeddings', if_exists=True)
+    op.execute(
+        f'ALTER TABLE scope_embeddings ALTER COLUMN embedding '
+        f'TYPE {target_type}({dim}) USING embedding::{target_type}({dim})'
+    )
+    if dim > _MAX_INDEXED_DIMENSIONS[target_type]:
+        print(f"[WARN] {dim} dimensions is too wide to index as {target_type}; skipping HNSW index")
+        return
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_scope_embeddings_hnsw',
+            'scope_embeddings',
+            ['embedding'],
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'embedding': ops},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def upgrade() -> None:
+    op.execute('ALTER EXTENSION vector UPDATE')
+    _convert('halfvec', 'halfvec_cosine_ops')
+
+
+def downgrade() -> None:
+    _convert('vector', 'vector_cosine_ops')
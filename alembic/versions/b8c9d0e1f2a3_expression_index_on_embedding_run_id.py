@@ -0,0 +1,51 @@
+"""Replace metadata GIN with an expression B-tree on metadata->>'run_id'
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-01-12
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b8c9d0e1f2a3'
+down_revision = 'a7b8c9d0e1f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_scope_embeddings_run_id',
+            'scope_embeddings',
+            [sa.text("(metadata->>'run_id')")],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_scope_embeddings_metadata_gin',
+            table_name='scope_embeddings',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_scope_embeddings_metadata_gin',
+            'scope_embeddings',
+            ['metadata'],
+            postgresql_using='gin',
+            postgresql_ops={'metadata': 'jsonb_path_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_scope_embeddings_run_id',
+            table_name='scope_embeddings',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
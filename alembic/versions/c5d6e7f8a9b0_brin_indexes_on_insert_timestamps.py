@@ -0,0 +1,47 @@
+"""Add BRIN indexes on insert-ordered timestamp columns
+
+These tables are append-only, so the timestamp set at insert follows the
+physical row order and a BRIN index covers time-range scans at a tiny
+fraction of a B-tree's size.
+
+Revision ID: c5d6e7f8a9b0
+Revises: b4c5d6e7f8a9
+Create Date: 2026-01-16
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'c5d6e7f8a9b0'
+down_revision = 'b4c5d6e7f8a9'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, column)
+_INDEXES = [
+    ('ix_runs_created_brin', 'runs', 'created_at'),
+    ('ix_run_steps_started_brin', 'run_steps', 'started_at'),
+    ('ix_artifacts_created_brin', 'artifacts', 'created_at'),
+    ('ix_scope_embeddings_created_brin', 'scope_embeddings', 'created_at'),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, column in _INDEXES:
+            op.create_index(
+                name,
+                table,
+                [column],
+                postgresql_using='brin',
+                postgresql_with={'pages_per_range': 32},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _column in reversed(_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,53 @@
+"""Add B-tree indexes on foreign key columns
+
+Postgres does not index the referencing side of a foreign key, so child
+lookups and cascading deletes were scanning the child tables.
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-01-13
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'c9d0e1f2a3b4'
+down_revision = 'b8c9d0e1f2a3'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns)
+_INDEXES = [
+    ('ix_teams_owner_id', 'teams', ['owner_id']),
+    ('ix_team_members_user_id', 'team_members', ['user_id']),
+    ('ix_projects_owner_id', 'projects', ['owner_id']),
+    ('ix_projects_team_id', 'projects', ['team_id']),
+    ('ix_project_files_project_id', 'project_files', ['project_id']),
+    ('ix_runs_project_created', 'runs', ['project_id', 'created_at']),
+    ('ix_runs_parent_run_id', 'runs', ['parent_run_id']),
+    ('ix_runs_extracted_variables_artifact_id', 'runs', ['extracted_variables_artifact_id']),
+    ('ix_run_steps_run_id', 'run_steps', ['run_id']),
+    ('ix_artifacts_run_created', 'artifacts', ['run_id', 'created_at']),
+    ('idx_scope_embeddings_project', 'scope_embeddings', ['project_id']),
+]
+
+# Single-column indexes from older databases superseded by the composites above
+_SUPERSEDED = [
+    ('ix_runs_project_id', 'runs'),
+    ('ix_artifacts_run_id', 'artifacts'),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in _INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        for name, table in _SUPERSEDED:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _columns in reversed(_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,68 @@
+"""Replace the ivfflat embedding index with HNSW
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-01-13
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd0e1f2a3b4c5'
+down_revision = 'c9d0e1f2a3b4'
+branch_labels = None
+depends_on = None
+
+
+# pgvector refuses HNSW (and ivfflat) indexes on wider vector columns
+_MAX_INDEXED_DIMENSIONS = 2000
+
+
+def _embedding_dimensions() -> int:
+    # HNSW can only be built on a vector column declared with a fixed dimension
+    typmod = op.get_bind().execute(
+        sa.text(
+            "SELECT atttypmod FROM pg_attribute "
+            "WHERE attrelid = 'scope_embeddings'::regclass AND attname = 'embedding'"
+        )
+    ).scalar()
+    return typmod if typmod is not None and typmod > 0 else 0
+
+
+def upgrade() -> None:
+    dim = _embedding_dimensions()
+    if not dim:
+        print("[WARN] scope_embeddings.embedding has no fixed dimension; skipping HNSW index")
+        return
+    if dim > _MAX_INDEXED_DIMENSIONS:
+        # The halfvec conversion in b4c5d6e7f8a9 builds the index instead
+        print(f"[WARN] scope_embeddings.embedding has {dim} dimensions; skipping HNSW index on vector")
+        return
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_scope_embeddings_hnsw',
+            'scope_embeddings',
+            ['embedding'],
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'embedding': 'vector_cosine_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'idx_scope_embeddings_embedding',
+            table_name='scope_embeddings',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_scope_embeddings_hnsw',
+            table_name='scope_embeddings',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,69 @@
+"""Move runs.included_file_ids into a run_included_files junction table
+
+Ids that no longer match a project file are dropped during the copy; the
+foreign keys now remove links when a run or file is deleted.
+
+Revision ID: d6e7f8a9b0c1
+Revises: c5d6e7f8a9b0
+Create Date: 2026-01-16
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'd6e7f8a9b0c1'
+down_revision = 'c5d6e7f8a9b0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('run_included_files',
+    sa.Column('run_id', sa.UUID(), nullable=False),
+    sa.Column('file_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['run_id'], ['runs.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['file_id'], ['project_files.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('run_id', 'file_id')
+    )
+    op.create_index('ix_run_included_files_file_id', 'run_included_files', ['file_id'])
+    op.execute(
+        """
+        INSERT INTO run_included_files (run_id, file_id)
+        SELECT DISTINCT r.id, f.id
+        FROM runs r
+        CROSS JOIN LATERAL jsonb_array_elements_text(
+            CASE WHEN jsonb_typeof(r.included_file_ids) = 'array' THEN r.included_file_ids ELSE '[]'::jsonb END
+        ) AS e(file_id)
+        JOIN project_files f ON f.id::text = e.file_id AND f.project_id = r.project_id
+        """
+    )
+    op.drop_column('runs', 'included_file_ids')
+
+
+def downgrade() -> None:
+    op.add_column(
+        'runs',
+        sa.Column(
+            'included_file_ids',
+            postgresql.JSONB(astext_type=sa.Text()),
+            server_default=sa.text("'[]'::jsonb"),
+            nullable=False,
+        ),
+    )
+    op.execute(
+        """
+        UPDATE runs r
+        SET included_file_ids = links.ids
+        FROM (
+            SELECT run_id, jsonb_agg(file_id::text) AS ids
+            FROM run_included_files
+            GROUP BY run_id
+        ) AS links
+        WHERE links.run_id = r.id
+        """
+    )
+    op.alter_column('runs', 'included_file_ids', server_default=None)
+    op.drop_index('ix_run_included_files_file_id', table_name='run_included_files')
+    op.drop_table('run_included_files')
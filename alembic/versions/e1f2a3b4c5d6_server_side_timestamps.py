@@ -0,0 +1,55 @@
+"""Fill created_at/updated_at on the server
+
+created_at columns default to now() and updated_at is maintained by the
+moddatetime trigger instead of Python-side defaults.
+
+Revision ID: e1f2a3b4c5d6
+Revises: d0e1f2a3b4c5
+Create Date: 2026-01-14
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e1f2a3b4c5d6'
+down_revision = 'd0e1f2a3b4c5'
+branch_labels = None
+depends_on = None
+
+
+_CREATED_AT_TABLES = [
+    'users',
+    'teams',
+    'team_members',
+    'projects',
+    'project_files',
+    'runs',
+    'run_versions',
+    'artifacts',
+    'scope_embeddings',
+    'google_auth',
+]
+_UPDATED_AT_TABLES = ['projects', 'google_auth']
+
+
+def upgrade() -> None:
+    for table in _CREATED_AT_TABLES:
+        op.alter_column(table, 'created_at', server_default=sa.func.now(), existing_nullable=False)
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS moddatetime')
+    for table in _UPDATED_AT_TABLES:
+        op.alter_column(table, 'updated_at', server_default=sa.func.now(), existing_nullable=False)
+        op.execute(
+            f'CREATE TRIGGER {table}_set_updated_at BEFORE UPDATE ON {table} '
+            'FOR EACH ROW EXECUTE FUNCTION moddatetime(updated_at)'
+        )
+
+
+def downgrade() -> None:
+    for table in _UPDATED_AT_TABLES:
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_set_updated_at ON {table}')
+        op.alter_column(table, 'updated_at', server_default=None, existing_nullable=False)
+
+    for table in _CREATED_AT_TABLES:
+        op.alter_column(table, 'created_at', server_default=None, existing_nullable=False)
@@ -0,0 +1,39 @@
+"""Index project_files by checksum
+
+Uploads look up an earlier file in the same project with identical bytes
+to reuse its page count, token counts and summary instead of analysing the
+upload again.
+
+Revision ID: e7f8a9b0c1d2
+Revises: d6e7f8a9b0c1
+Create Date: 2026-01-17
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'e7f8a9b0c1d2'
+down_revision = 'd6e7f8a9b0c1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_project_files_checksum',
+            'project_files',
+            ['project_id', 'checksum'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_project_files_checksum',
+            table_name='project_files',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
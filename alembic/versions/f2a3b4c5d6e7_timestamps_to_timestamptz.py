@@ -0,0 +1,65 @@
+"""Store every timestamp column as timestamptz
+
+Existing naive values were written as UTC, so they are reinterpreted
+AT TIME ZONE 'UTC' rather than in the session time zone.
+
+Revision ID: f2a3b4c5d6e7
+Revises: e1f2a3b4c5d6
+Create Date: 2026-01-14
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f2a3b4c5d6e7'
+down_revision = 'e1f2a3b4c5d6'
+branch_labels = None
+depends_on = None
+
+
+_COLUMNS = {
+    'users': ['created_at'],
+    'teams': ['created_at'],
+    'team_members': ['created_at'],
+    'projects': ['created_at', 'updated_at'],
+    'project_files': ['created_at'],
+    'runs': ['created_at', 'started_at', 'finished_at'],
+    'run_versions': ['created_at'],
+    'run_steps': ['started_at', 'finished_at'],
+    'artifacts': ['created_at'],
+    'scope_embeddings': ['created_at'],
+    'google_auth': ['token_expiry', 'state_created_at', 'created_at', 'updated_at'],
+}
+
+
+def _columns_of_type(data_type: str):
+    # scope_embeddings may already be timestamptz when the vector store created it
+    rows = op.get_bind().execute(
+        sa.text(
+            "SELECT table_name, column_name FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND data_type = :data_type"
+        ),
+        {"data_type": data_type},
+    )
+    present = {(row.table_name, row.column_name) for row in rows}
+    for table, columns in _COLUMNS.items():
+        for column in columns:
+            if (table, column) in present:
+                yield table, column
+
+
+def upgrade() -> None:
+    for table, column in list(_columns_of_type('timestamp without time zone')):
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} "
+            f"TYPE timestamptz USING {column} AT TIME ZONE 'UTC'"
+        )
+
+
+def downgrade() -> None:
+    for table, column in list(_columns_of_type('timestamp with time zone')):
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} "
+            f"TYPE timestamp USING {column} AT TIME ZONE 'UTC'"
+        )
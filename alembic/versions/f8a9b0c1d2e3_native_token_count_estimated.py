@@ -0,0 +1,30 @@
+"""Flag estimated native token counts on project_files
+
+Oversized uploads cannot be counted by the token-counting API, so their
+native_token_count is an estimate; the flag keeps it distinguishable from
+a real count.
+
+Revision ID: f8a9b0c1d2e3
+Revises: e7f8a9b0c1d2
+Create Date: 2026-01-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f8a9b0c1d2e3'
+down_revision = 'e7f8a9b0c1d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'project_files',
+        sa.Column('native_token_count_estimated', sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('project_files', 'native_token_count_estimated')
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional
 
 
 @dataclass
@@ -33,9 +33,22 @@ class StorageBackend:
     def download_to_path(self, key: str, destination: Path) -> None:
         raise NotImplementedError
 
+    def open_stream(self, key: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        """Open `key` for reading and return an iterator over its bytes.
+
+        Missing objects raise here rather than on first iteration, so callers
+        can report errors before any response bytes are sent.
+        """
+        raise NotImplementedError
+
     def delete(self, key: str) -> None:
         raise NotImplementedError
 
+    def delete_many(self, keys: Iterable[str]) -> None:
+        """Delete several objects; backends with a bulk API override this."""
+        for key in keys:
+            self.delete(key)
+
     def list(self, prefix: str) -> List[StorageObject]:
         raise NotImplementedError
 
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import shutil
 from pathlib import Path
-from typing import List, Optional
+from typing import BinaryIO, Iterator, List, Optional
 
 from .base import StorageBackend, StorageObject
 
@@ -42,6 +42,18 @@ class LocalStorageBackend(StorageBackend):
         destination.parent.mkdir(parents=True, exist_ok=True)
         shutil.copy2(source, destination)
 
+    def open_stream(self, key: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        source = self._resolve(key)
+        if not source.exists():
+            raise FileNotFoundError(source)
+        return self._iter_file(source.open("rb"), chunk_size)
+
+    @staticmethod
+    def _iter_file(handle: BinaryIO, chunk_size: int) -> Iterator[bytes]:
+        with handle:
+            while chunk := handle.read(chunk_size):
+                yield chunk
+
     def delete(self, key: str) -> None:
         target = self._base_dir / key
         if target.exists():
@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
+from contextlib import closing
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Union
 
 import httpx
 
@@ -52,15 +53,26 @@ class SupabaseStorageBackend(StorageBackend):
         path = source_path.resolve()
         if not path.exists():
             raise FileNotFoundError(path)
-        data = path.read_bytes()
-        return self._upload(key, data=data, content_type=content_type)
+        # httpx streams the open file as the request body
+        with path.open("rb") as handle:
+            return self._upload(key, data=handle, content_type=content_type, size=path.stat().st_size)
 
     def download_to_path(self, key: str, destination: Path) -> None:
-        response = self._client.get(f"/object/{self._config.bucket}/{key}")
+        # Written chunk by chunk so the object is never held in memory whole
+        chunks = self.open_stream(key)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        with closing(chunks), destination.open("wb") as handle:
+            for chunk in chunks:
+                handle.write(chunk)
+
+    def open_stream(self, key: str, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        request = self._client.build_request("GET", f"/object/{self._config.bucket}/{key}")
+        response = self._client.send(request, stream=True)
         if response.status_code >= 400:
+            response.read()
+            response.close()
             raise StorageError(f"Failed to download '{key}': {response.status_code} {response.text}")
-        destination.parent.mkdir(parents=True, exist_ok=True)
-        destination.write_bytes(response.content)
+        return self._iter_response(response, chunk_size)
 
     def delete(self, key: str) -> None:
         payload = {"paths": [key]}
@@ -68,6 +80,17 @@ class SupabaseStorageBackend(StorageBackend):
         if response.status_code >= 400:
             raise StorageError(f"Failed to delete '{key}': {response.status_code} {response.text}")
 
+    def delete_many(self, keys: Iterable[str]) -> None:
+        # The delete endpoint takes a list of paths; it accepts up to 1000 per call
+        paths = list(keys)
+        for start in range(0, len(paths), 1000):
+            batch = paths[start:start + 1000]
+            response = self._client.post(f"/object/delete/{self._config.bucket}", json={"paths": batch})
+            if response.status_code >= 400:
+                raise StorageError(
+                    f"Failed to delete {len(batch)} objects: {response.status_code} {response.text}"
+                )
+
     def list(self, prefix: str) -> List[StorageObject]:
         objects: List[StorageObject] = []
         page = 0
@@ -116,7 +139,21 @@ class SupabaseStorageBackend(StorageBackend):
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
-    def _upload(self, key: str, *, data: bytes, content_type: Optional[str]) -> StorageObject:
+    @staticmethod
+    def _iter_response(response: httpx.Response, chunk_size: int) -> Iterator[bytes]:
+        try:
+            yield from response.iter_bytes(chunk_size)
+        finally:
+            response.close()
+
+    def _upload(
+        self,
+        key: str,
+        *,
+        data: Union[bytes, BinaryIO],
+        content_type: Optional[str],
+        size: Optional[int] = None,
+    ) -> StorageObject:
         headers = {"content-type": content_type} if content_type else None
         response = self._client.post(
             f"/object/{self._config.bucket}/{key}",
@@ -126,6 +163,6 @@ class SupabaseStorageBackend(StorageBackend):
         )
         if response.status_code >= 400:
             raise StorageError(f"Failed to upload '{key}': {response.status_code} {response.text}")
-        return StorageObject(key=key, size=len(data), content_type=content_type)
+        return StorageObject(key=key, size=len(data) if size is None else size, content_type=content_type)
 
 
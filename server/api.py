@@ -11,11 +11,10 @@ from server.core.config import (
     CORS_ALLOW_CREDENTIALS,
     CORS_ALLOW_ORIGINS,
     DATABASE_DSN,
-    HISTORY_EMBEDDING_MODEL,
+    HISTORY_EMBEDDING_DIMENSIONS,
     HISTORY_ENABLED,
     VECTOR_STORE_DSN,
 )
-from server.core.history_profiles import EMBED_DIMENSIONS
 from server.db.session import engine
 
 from .routes import (
@@ -32,6 +31,7 @@ from .routes import (
 )
 from .routes.google_oauth import google_oauth_router, legacy_google_oauth_router
 from .services import VectorStore, VectorStoreError, JobRegistry
+from .services.token_counter import aclose_client as aclose_token_client
 
 # Basic logging config (stdout) if not already configured by the host.
 if not logging.getLogger().handlers:
@@ -52,14 +52,13 @@ def _attach_vector_store(app: FastAPI) -> None:
         return
 
     try:
-        embedding_dim = EMBED_DIMENSIONS.get(HISTORY_EMBEDDING_MODEL, 1536)
+        embedding_dim = HISTORY_EMBEDDING_DIMENSIONS
         logger.info("Initializing vector store with dimension %s (using SQLAlchemy pool)", embedding_dim)
         # Use SQLAlchemy engine - shares connection pool with rest of app
         store = VectorStore(engine, embedding_dim=embedding_dim)
-        # Don't call ensure_schema() at startup - it forces connection creation
-        # Schema will be created lazily on first use
+        # No DDL at startup or on first use - `alembic upgrade head` owns the schema
         app.state.vector_store = store
-        logger.info("Vector store initialized successfully (schema will be created on first use)")
+        logger.info("Vector store initialized successfully")
     except Exception as exc:  # pragma: no cover - logging path
         app.state.vector_store = None
         detail = exc if isinstance(exc, VectorStoreError) else str(exc)
@@ -110,8 +109,7 @@ def create_app() -> FastAPI:
     async def shutdown_event():
         """Clean up resources on application shutdown."""
         # VectorStore uses SQLAlchemy engine pool, which is managed by the engine
-        # No cleanup needed here
-        pass
+        await aclose_token_client()
 
     @app.middleware("http")
     async def error_logging_middleware(request: Request, call_next):
@@ -82,6 +82,12 @@ def _env_flag(name: str, default: str = "false") -> bool:
 
 HISTORY_ENABLED = _env_flag("HISTORY_ENABLED")
 HISTORY_EMBEDDING_MODEL = os.getenv("HISTORY_EMBEDDING_MODEL", "text-embedding-3-small")
+EMBED_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+}
+# Width of stored history embeddings; sizes both the ORM column and the vector store
+HISTORY_EMBEDDING_DIMENSIONS = EMBED_DIMENSIONS.get(HISTORY_EMBEDDING_MODEL, 1536)
 HISTORY_TOPN = int(os.getenv("HISTORY_TOPN", "12"))
 
 # Web research configuration
@@ -96,6 +102,15 @@ PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY") or os.getenv("PERP_API_KEY"
 # Ref: https://docs.perplexity.ai/getting-started/models/models/sonar-pro
 PERPLEXITY_MODEL = os.getenv("PERPLEXITY_MODEL", "sonar-pro")
 PERPLEXITY_BASE_URL = os.getenv("PERPLEXITY_BASE_URL", "https://api.perplexity.ai")
+# Cached Perplexity answers older than this are re-queried
+PERPLEXITY_CACHE_TTL_SECONDS = int(os.getenv("PERPLEXITY_CACHE_TTL_SECONDS", str(60 * 60 * 24 * 7)))
+# Point experiments at a scratch directory so they never seed the real cache
+PERPLEXITY_CACHE_DIR = Path(os.getenv("PERPLEXITY_CACHE_DIR") or OUTPUT_DIR / "artifacts" / "perplexity")
+# Optional near-duplicate lookup using prompt embeddings (requires OPENAI_API_KEY)
+PERPLEXITY_SEMANTIC_CACHE = _env_flag("PERPLEXITY_SEMANTIC_CACHE")
+PERPLEXITY_SEMANTIC_THRESHOLD = float(os.getenv("PERPLEXITY_SEMANTIC_THRESHOLD", "0.97"))
+# Newest prompts kept in the semantic index; older ones are evicted
+PERPLEXITY_SEMANTIC_MAX_ENTRIES = max(1, int(os.getenv("PERPLEXITY_SEMANTIC_MAX_ENTRIES", "500")))
 
 # API Configuration
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
@@ -104,6 +119,9 @@ CLAUDE_MODEL = os.getenv("CLAUDE_MODEL", "claude-opus-4-5")
 CLAUDE_CONTEXT_LIMIT = int(os.getenv("CLAUDE_CONTEXT_LIMIT", "100000"))
 # Extended thinking budget (tokens allocated for Claude's internal reasoning)
 CLAUDE_THINKING_BUDGET = int(os.getenv("CLAUDE_THINKING_BUDGET", "12000"))
+# Upload summarizer attachments once via the Anthropic Files API (beta) and
+# reference them by file_id instead of re-sending base64 on every call
+ANTHROPIC_FILES_API_ENABLED = _env_flag("ANTHROPIC_FILES_API_ENABLED")
 
 # Gemini image generation (Nano Banana Pro)
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
@@ -124,6 +142,10 @@ SUPABASE_BUCKET = os.getenv("SUPABASE_BUCKET", "scope-docs")
 
 # Artifact delivery configuration
 ARTIFACT_URL_EXPIRY_SECONDS = int(os.getenv("ARTIFACT_URL_EXPIRY_SECONDS", "3600"))
+# Files stored and analysed at once within a single upload request
+UPLOAD_CONCURRENCY = max(1, int(os.getenv("UPLOAD_CONCURRENCY", "8")))
+# Largest single file accepted by the upload endpoint, in bytes
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(500 * 1024 * 1024)))
 
 # Google OAuth / Docs integration (per-user, via OAuth 2.0)
 GOOGLE_OAUTH_CLIENT_ID = os.getenv("GOOGLE_OAUTH_CLIENT_ID")
@@ -4,16 +4,17 @@ from __future__ import annotations
 
 import hashlib
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Iterable, List, Optional, Sequence
 
 import os
 from openai import OpenAI
 
 
-EMBED_DIMENSIONS = {
-    "text-embedding-3-small": 1536,
-    "text-embedding-3-large": 3072,
-}
+from .config import EMBED_DIMENSIONS
+
+# Inputs per embeddings request; the API allows 2048 inputs and 300k tokens,
+# and run chunks are ~375 tokens each.
+EMBED_BATCH_SIZE = 256
 
 
 class ProfileEmbedder:
@@ -40,6 +41,17 @@ class ProfileEmbedder:
         )
         return response.data[0].embedding
 
+    def embed_many(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed several texts with one API request per EMBED_BATCH_SIZE inputs."""
+        embeddings: List[List[float]] = []
+        for start in range(0, len(texts), EMBED_BATCH_SIZE):
+            response = self.client.embeddings.create(
+                model=self.model_name,
+                input=list(texts[start:start + EMBED_BATCH_SIZE]),
+            )
+            embeddings.extend(item.embedding for item in sorted(response.data, key=lambda item: item.index))
+        return embeddings
+
 
 def hash_file(path: Path) -> str:
     hasher = hashlib.sha256()
@@ -319,166 +319,170 @@ class ScopeDocGenerator:
             mode = ResearchMode.QUICK
 
         research_manager = ResearchManager(mode)
-        if mode is ResearchMode.FULL:
-            notify("research", "started", None)
-        research_findings = research_manager.gather_research(context_pack, project_focus_hint)
-        notify("research", "completed", f"mode={mode.value}; findings={len(research_findings)}")
-
-        # Save artifacts
-        artifacts_dir = self.artifacts_dir
-        artifacts_dir.mkdir(parents=True, exist_ok=True)
-        context_path = artifacts_dir / "context_pack.json"
-        with open(context_path, 'w', encoding='utf-8') as f:
-            json.dump(context_pack, f, indent=2)
-        print(f"[OK] Saved context pack: {context_path}")
-
-        # Step 4: Extract variables using Claude
-        print("\n" + "="*80)
-        print("EXTRACTING VARIABLES")
-        print("="*80)
+        # The manager holds pooled HTTP clients; close them however this block exits
+        try:
+            if mode is ResearchMode.FULL:
+                notify("research", "started", None)
+            research_findings = research_manager.gather_research(context_pack, project_focus_hint)
+            notify("research", "completed", f"mode={mode.value}; findings={len(research_findings)}")
+
+            # Save artifacts
+            artifacts_dir = self.artifacts_dir
+            artifacts_dir.mkdir(parents=True, exist_ok=True)
+            context_path = artifacts_dir / "context_pack.json"
+            with open(context_path, 'w', encoding='utf-8') as f:
+                json.dump(context_pack, f, indent=2)
+            print(f"[OK] Saved context pack: {context_path}")
+
+            # Step 4: Extract variables using Claude
+            print("\n" + "="*80)
+            print("EXTRACTING VARIABLES")
+            print("="*80)
         
-        # Build compact extraction input: instructions + context_pack + top-K evidence quotes per file
-        reference_block = None
-        if self.history_retriever:
-            try:
-                reference_block = self.history_retriever.fetch_reference_block(context_pack)
-                if reference_block:
-                    print("[OK] Loaded reference estimates from historical scopes")
-            except Exception as history_err:
-                print(f"[WARN] Failed to fetch historical references: {history_err}")
-
-        compact_input = self._build_compact_input(
-            analysis_docs,
-            context_pack,
-            max_quotes_per_file=5,
-            instructions=instructions,
-            reference_block=reference_block,
-            research_findings=research_findings,
-        )
-
-        input_size = len(compact_input)
-        if input_size > 120_000:
-            print(
-                f"[WARN] Claude extraction payload is very large ({input_size:,} characters). "
-                "Consider reducing document size or summarizing additional files to avoid malformed responses."
+            # Build compact extraction input: instructions + context_pack + top-K evidence quotes per file
+            reference_block = None
+            if self.history_retriever:
+                try:
+                    reference_block = self.history_retriever.fetch_reference_block(context_pack)
+                    if reference_block:
+                        print("[OK] Loaded reference estimates from historical scopes")
+                except Exception as history_err:
+                    print(f"[WARN] Failed to fetch historical references: {history_err}")
+
+            compact_input = self._build_compact_input(
+                analysis_docs,
+                context_pack,
+                max_quotes_per_file=5,
+                instructions=instructions,
+                reference_block=reference_block,
+                research_findings=research_findings,
             )
 
-        use_web_search = (
-            allow_web_search
-            and research_manager.allows_web_search_tool()
-            and self.extractor.supports_web_search
-        )
-        notify("extract", "started", None)
-
-        try:
-            if getattr(self, 'debug', False):
-                variables, raw = self.extractor.extract_variables_with_raw(
-                    compact_input,
-                    self.variables_schema,
-                    self.variables_guide,
-                    file_context=file_context,
-                    attachments=attachments,
-                    use_web_search=use_web_search,
-                )
-                # Persist raw model output for debugging
-                debug_raw_path = self.output_dir / "claude_raw_output.json"
-                try:
-                    with open(debug_raw_path, 'w', encoding='utf-8') as f:
-                        f.write(raw)
-                    print(f"[OK] Saved raw model output to: {debug_raw_path}")
-                except Exception as e:
-                    print(f"[WARN] Could not save raw output: {e}")
-            else:
-                variables = self.extractor.extract_variables(
-                    compact_input,
-                    self.variables_schema,
-                    self.variables_guide,
-                    file_context=file_context,
-                    attachments=attachments,
-                    use_web_search=use_web_search,
-                )
-        except Exception as extract_exc:
-            detail = str(extract_exc)
-            notify("extract", "failed", detail)
-            print("[ERROR] Variable extraction failed:", detail)
-            if "No JSON object found" in detail:
+            input_size = len(compact_input)
+            if input_size > 120_000:
                 print(
-                    "[HINT] Claude returned malformed JSON. "
-                    "Large inputs or unexpected model output can cause this. Check logs and consider minimizing the prompt."
+                    f"[WARN] Claude extraction payload is very large ({input_size:,} characters). "
+                    "Consider reducing document size or summarizing additional files to avoid malformed responses."
                 )
-            raise
 
-        notify("extract", "completed", None)
-
-        # Capture feedback/confidence for full runs
-        try:
-            feedback = self.extractor.generate_feedback(
-                combined_documents=compact_input,
-                variables=variables,
-                output_markdown=None,
+            use_web_search = (
+                allow_web_search
+                and research_manager.allows_web_search_tool()
+                and self.extractor.supports_web_search
             )
-            if feedback:
-                self.last_feedback = feedback
-        except Exception as feedback_exc:
-            print(f"[WARN] Feedback capture failed: {feedback_exc}")
+            notify("extract", "started", None)
 
-        # Force date_created to a known value (avoid LLM guessing)
-        try:
-            variables['date_created'] = date_override or datetime.now().date().isoformat()
-        except Exception:
-            pass
+            try:
+                if getattr(self, 'debug', False):
+                    variables, raw = self.extractor.extract_variables_with_raw(
+                        compact_input,
+                        self.variables_schema,
+                        self.variables_guide,
+                        file_context=file_context,
+                        attachments=attachments,
+                        use_web_search=use_web_search,
+                    )
+                    # Persist raw model output for debugging
+                    debug_raw_path = self.output_dir / "claude_raw_output.json"
+                    try:
+                        with open(debug_raw_path, 'w', encoding='utf-8') as f:
+                            f.write(raw)
+                        print(f"[OK] Saved raw model output to: {debug_raw_path}")
+                    except Exception as e:
+                        print(f"[WARN] Could not save raw output: {e}")
+                else:
+                    variables = self.extractor.extract_variables(
+                        compact_input,
+                        self.variables_schema,
+                        self.variables_guide,
+                        file_context=file_context,
+                        attachments=attachments,
+                        use_web_search=use_web_search,
+                    )
+            except Exception as extract_exc:
+                detail = str(extract_exc)
+                notify("extract", "failed", detail)
+                print("[ERROR] Variable extraction failed:", detail)
+                if "No JSON object found" in detail:
+                    print(
+                        "[HINT] Claude returned malformed JSON. "
+                        "Large inputs or unexpected model output can cause this. Check logs and consider minimizing the prompt."
+                    )
+                raise
+
+            notify("extract", "completed", None)
+
+            # Capture feedback/confidence for full runs
+            try:
+                feedback = self.extractor.generate_feedback(
+                    combined_documents=compact_input,
+                    variables=variables,
+                    output_markdown=None,
+                )
+                if feedback:
+                    self.last_feedback = feedback
+            except Exception as feedback_exc:
+                print(f"[WARN] Feedback capture failed: {feedback_exc}")
+
+            # Force date_created to a known value (avoid LLM guessing)
+            try:
+                variables['date_created'] = date_override or datetime.now().date().isoformat()
+            except Exception:
+                pass
         
-        # Persist extracted variables for downstream use
-        intermediate_path = self.output_dir / "extracted_variables.json"
-        with open(intermediate_path, 'w', encoding='utf-8') as f:
-            json.dump(variables, f, indent=2)
-        print(f"[OK] Saved extracted variables to: {intermediate_path}")
+            # Persist extracted variables for downstream use
+            intermediate_path = self.output_dir / "extracted_variables.json"
+            with open(intermediate_path, 'w', encoding='utf-8') as f:
+                json.dump(variables, f, indent=2)
+            print(f"[OK] Saved extracted variables to: {intermediate_path}")
         
-        # Optional: Post-extraction verification research (Perplexity FULL mode)
-        # Verifies API/service availability based on extracted tech stack/integrations.
-        post_findings = []
-        if mode is ResearchMode.FULL:
-            try:
-                post_findings = research_manager.gather_post_extraction(variables)
-                if post_findings:
-                    print(f"[OK] Post-extraction research findings: {len(post_findings)}")
-                    # Merge findings into appendices and assumptions (minimally, concisely)
-                    # 1) Appendices: add up to 5 unique references as 'Service API docs – URL'
-                    existing_appendices = (variables.get('appendices') or '').strip()
-                    appendix_lines = [ln.strip() for ln in existing_appendices.splitlines() if ln.strip()]
-                    added = 0
-                    seen_urls = set()
-                    for fnd in post_findings:
-                        for url in fnd.references[:3]:
+            # Optional: Post-extraction verification research (Perplexity FULL mode)
+            # Verifies API/service availability based on extracted tech stack/integrations.
+            post_findings = []
+            if mode is ResearchMode.FULL:
+                try:
+                    post_findings = research_manager.gather_post_extraction(variables)
+                    if post_findings:
+                        print(f"[OK] Post-extraction research findings: {len(post_findings)}")
+                        # Merge findings into appendices and assumptions (minimally, concisely)
+                        # 1) Appendices: add up to 5 unique references as 'Service API docs – URL'
+                        existing_appendices = (variables.get('appendices') or '').strip()
+                        appendix_lines = [ln.strip() for ln in existing_appendices.splitlines() if ln.strip()]
+                        added = 0
+                        seen_urls = set()
+                        for fnd in post_findings:
+                            for url in fnd.references[:3]:
+                                if added >= 5:
+                                    break
+                                if url in seen_urls:
+                                    continue
+                                seen_urls.add(url)
+                                appendix_lines.append(f"Reference – {url}")
+                                added += 1
                             if added >= 5:
                                 break
-                            if url in seen_urls:
-                                continue
-                            seen_urls.add(url)
-                            appendix_lines.append(f"Reference – {url}")
-                            added += 1
-                        if added >= 5:
-                            break
-                    if appendix_lines:
-                        variables['appendices'] = "\n".join(appendix_lines)
-
-                    # 2) Assumptions & requirements: ensure access bullets for up to 3 services
-                    ar_list = variables.get('assumptions_requirements') or []
-                    if not isinstance(ar_list, list):
-                        ar_list = []
-                    # Build simple service-access assumptions
-                    svc_names = []
-                    for fnd in post_findings:
-                        name = (fnd.query.split("'", 2)[1] if "'" in fnd.query else None) or None
-                        if name and name not in svc_names:
-                            svc_names.append(name)
-                    for name in svc_names[:3]:
-                        bullet = f"Client provides API access/credentials for {name}"
-                        if bullet not in ar_list and len(ar_list) < 6:
-                            ar_list.append(bullet)
-                    variables['assumptions_requirements'] = ar_list
-            except Exception as post_err:
-                print(f"[WARN] Post-extraction research failed: {post_err}")
+                        if appendix_lines:
+                            variables['appendices'] = "\n".join(appendix_lines)
+
+                        # 2) Assumptions & requirements: ensure access bullets for up to 3 services
+                        ar_list = variables.get('assumptions_requirements') or []
+                        if not isinstance(ar_list, list):
+                            ar_list = []
+                        # Build simple service-access assumptions
+                        svc_names = []
+                        for fnd in post_findings:
+                            name = (fnd.query.split("'", 2)[1] if "'" in fnd.query else None) or None
+                            if name and name not in svc_names:
+                                svc_names.append(name)
+                        for name in svc_names[:3]:
+                            bullet = f"Client provides API access/credentials for {name}"
+                            if bullet not in ar_list and len(ar_list) < 6:
+                                ar_list.append(bullet)
+                        variables['assumptions_requirements'] = ar_list
+                except Exception as post_err:
+                    print(f"[WARN] Post-extraction research failed: {post_err}")
+        finally:
+            research_manager.close()
         
         # Step 4: Interactive refinement (optional)
         if interactive:
@@ -592,14 +596,14 @@ class ScopeDocGenerator:
         if research_mode == "full":
             notify("research", "started", "perplexity")
             try:
-                research_manager = ResearchManager(ResearchMode.FULL)
                 # Build a simple context pack from the combined docs
                 context_pack = {
                     "integration_notes": [],
                     "pain_points": [],
                     "unknowns": [],
                 }
-                findings = research_manager.gather_research(context_pack, project_identifier)
+                with ResearchManager(ResearchMode.FULL) as research_manager:
+                    findings = research_manager.gather_research(context_pack, project_identifier)
                 if findings:
                     research_lines = ["[RESEARCH FINDINGS]"]
                     for finding in findings:
@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 import logging
-import re
 from pathlib import Path
 from typing import List, Optional, Dict, Any, Tuple
 
@@ -25,6 +24,30 @@ except ImportError:
     process_markdown_content = None
     logger.info("markgdoc not installed, using legacy markdown conversion")
 
+# Prefer the third-party `regex` engine when present; it supports possessive
+# quantifiers, which keep bold matching linear on malformed markdown.
+try:
+    import regex as _re  # type: ignore
+    _BOLD_RE = _re.compile(r"\*\*((?:[^*]++|\*(?!\*))+?)\*\*|__((?:[^_]++|_(?!_))+?)__")
+except ImportError:  # pragma: no cover - optional dependency
+    import re as _re
+    _BOLD_RE = _re.compile(r"\*\*((?:[^*]|\*(?!\*))+?)\*\*|__((?:[^_]|_(?!_))+?)__")
+
+_ITALIC_RE = _re.compile(r"(?<!\*)\*(?!\*)(.+?)(?<!\*)\*(?!\*)|(?<!_)_(?!_)(.+?)(?<!_)_(?!_)")
+_NUMBERED_RE = _re.compile(r"^(\d+)\.\s+(.+)$")
+
+# Line kinds keyed by the first character of a stripped markdown line; lines
+# whose first character is not listed are numbered-list or paragraph text.
+_LINE_DISPATCH = {
+    "`": "code_fence",
+    "|": "table",
+    "#": "heading",
+    "-": "bullet",
+    "*": "bullet",
+    ">": "quote",
+}
+_HORIZONTAL_RULES = frozenset(("---", "***", "___"))
+
 
 def create_google_doc_from_markdown(
     content: str,
@@ -160,10 +183,10 @@ def _parse_markdown_to_requests(content: str) -> List[Dict[str, Any]]:
         
         while i < len(text):
             # Look for **text** or __text__
-            match = re.search(r"\*\*(.+?)\*\*|__(.+?)__", text[i:])
+            match = _BOLD_RE.search(text, i)
             if match:
                 # Add text before match
-                before = text[i:i+match.start()]
+                before = text[i:match.start()]
                 clean_text += before
                 start_pos = len(clean_text)
                 
@@ -173,7 +196,7 @@ def _parse_markdown_to_requests(content: str) -> List[Dict[str, Any]]:
                 end_pos = len(clean_text)
                 
                 bold_ranges.append((start_pos, end_pos))
-                i += match.end()
+                i = match.end()
             else:
                 clean_text += text[i:]
                 break
@@ -188,9 +211,9 @@ def _parse_markdown_to_requests(content: str) -> List[Dict[str, Any]]:
         
         while i < len(text):
             # Look for *text* or _text_ (but not ** or __)
-            match = re.search(r"(?<!\*)\*(?!\*)(.+?)(?<!\*)\*(?!\*)|(?<!_)_(?!_)(.+?)(?<!_)_(?!_)", text[i:])
+            match = _ITALIC_RE.search(text, i)
             if match:
-                before = text[i:i+match.start()]
+                before = text[i:match.start()]
                 clean_text += before
                 start_pos = len(clean_text)
                 
@@ -199,7 +222,7 @@ def _parse_markdown_to_requests(content: str) -> List[Dict[str, Any]]:
                 end_pos = len(clean_text)
                 
                 italic_ranges.append((start_pos, end_pos))
-                i += match.end()
+                i = match.end()
             else:
                 clean_text += text[i:]
                 break
@@ -208,9 +231,10 @@ def _parse_markdown_to_requests(content: str) -> List[Dict[str, Any]]:
     
     for line in lines:
         stripped = line.strip()
+        kind = _LINE_DISPATCH.get(stripped[:1])
         
         # Handle code blocks
-        if stripped.startswith("```"):
+        if kind == "code_fence" and stripped.startswith("```"):
             if in_code_block:
                 if code_buffer:
                     document_parts.append({
@@ -228,7 +252,7 @@ def _parse_markdown_to_requests(content: str) -> List[Dict[str, Any]]:
             continue
         
         # Handle tables (convert to plain text for now)
-        if stripped.startswith("|"):
+        if kind == "table":
             if not in_table:
                 in_table = True
             table_buffer.append(stripped)
@@ -255,7 +279,7 @@ def _parse_markdown_to_requests(content: str) -> List[Dict[str, Any]]:
             continue
         
         # Headings
-        if stripped.startswith("#"):
+        if kind == "heading":
             level = len(stripped) - len(stripped.lstrip("#"))
             text = stripped[level:].strip()
             if text:
@@ -269,7 +293,7 @@ def _parse_markdown_to_requests(content: str) -> List[Dict[str, Any]]:
             continue
         
         # Numbered lists
-        match = re.match(r"^(\d+)\.\s+(.+)$", stripped)
+        match = _NUMBERED_RE.match(stripped) if kind is None else None
         if match:
             list_text = match.group(2).strip()
             if list_text:
@@ -282,7 +306,7 @@ def _parse_markdown_to_requests(content: str) -> List[Dict[str, Any]]:
             continue
         
         # Bullet points
-        if stripped.startswith(("- ", "* ")):
+        if kind == "bullet" and stripped[1:2] == " ":
             bullet_text = stripped[2:].strip()
             if bullet_text:
                 clean_text, bold_ranges = _extract_bold_ranges(bullet_text)
@@ -294,7 +318,7 @@ def _parse_markdown_to_requests(content: str) -> List[Dict[str, Any]]:
             continue
         
         # Block quotes
-        if stripped.startswith(">"):
+        if kind == "quote":
             quote_text = stripped[1:].strip()
             if quote_text:
                 clean_text, bold_ranges = _extract_bold_ranges(quote_text)
@@ -306,7 +330,7 @@ def _parse_markdown_to_requests(content: str) -> List[Dict[str, Any]]:
             continue
         
         # Horizontal rules
-        if stripped in ["---", "***", "___"]:
+        if stripped in _HORIZONTAL_RULES:
             document_parts.append({
                 "text": "─" * 50,
                 "type": "paragraph",
@@ -341,34 +365,29 @@ def _parse_markdown_to_requests(content: str) -> List[Dict[str, Any]]:
                         "bold_ranges": []
                     })
     
-    # Build full text and track formatting positions
-    full_text = ""
+    # Build full text and track formatting positions. Only compact
+    # (start, end, type, level, bold_ranges) tuples are retained per part;
+    # bold ranges are stored as absolute document offsets.
+    text_chunks: List[str] = []
     current_index = 1
-    formatting_info: List[Dict[str, Any]] = []
+    formatting_info: List[Tuple[int, int, str, Optional[int], List[Tuple[int, int]]]] = []
     
     for part in document_parts:
         text = part["text"]
         start_index = current_index
-        full_text += text + "\n"
+        text_chunks.append(text)
         end_index = current_index + len(text)
         
-        formatting_info.append({
-            "start": start_index,
-            "end": end_index,
-            "type": part["type"],
-            "level": part.get("level"),
-            "bold_ranges": part.get("bold_ranges", []),
-            "is_code": part["type"] == "code",
-            "is_bullet": part["type"] == "bullet",
-            "is_numbered": part["type"] == "numbered"
-        })
+        bold_ranges = [
+            (start_index + bold_start, start_index + bold_end)
+            for bold_start, bold_end in part.get("bold_ranges", ())
+        ]
+        formatting_info.append((start_index, end_index, part["type"], part.get("level"), bold_ranges))
         
         current_index += len(text) + 1  # +1 for newline
     
-    # Remove trailing newline
-    if full_text.endswith("\n"):
-        full_text = full_text[:-1]
-        current_index -= 1
+    # Join with newlines (no trailing newline after the last part)
+    full_text = "\n".join(text_chunks)
     
     # Insert all text at once
     if full_text:
@@ -380,22 +399,19 @@ def _parse_markdown_to_requests(content: str) -> List[Dict[str, Any]]:
         })
     
     # Apply formatting (process in reverse to avoid index issues)
-    for info in reversed(formatting_info):
-        start = info["start"]
-        end = info["end"]
-        
+    for start, end, part_type, level, bold_ranges in reversed(formatting_info):
         # Headings
-        if info["type"] == "heading" and info["level"]:
+        if part_type == "heading" and level:
             requests.append({
                 "updateParagraphStyle": {
                     "range": {"startIndex": start, "endIndex": end},
-                    "paragraphStyle": {"namedStyleType": f"HEADING_{info['level']}"},
+                    "paragraphStyle": {"namedStyleType": f"HEADING_{level}"},
                     "fields": "namedStyleType"
                 }
             })
         
         # Bullets
-        if info["is_bullet"]:
+        if part_type == "bullet":
             requests.append({
                 "createParagraphBullets": {
                     "range": {"startIndex": start, "endIndex": end},
@@ -404,7 +420,7 @@ def _parse_markdown_to_requests(content: str) -> List[Dict[str, Any]]:
             })
         
         # Numbered lists
-        if info["is_numbered"]:
+        if part_type == "numbered":
             requests.append({
                 "createParagraphBullets": {
                     "range": {"startIndex": start, "endIndex": end},
@@ -413,7 +429,7 @@ def _parse_markdown_to_requests(content: str) -> List[Dict[str, Any]]:
             })
         
         # Code blocks
-        if info["is_code"]:
+        if part_type == "code":
             requests.append({
                 "updateTextStyle": {
                     "range": {"startIndex": start, "endIndex": end},
@@ -426,9 +442,7 @@ def _parse_markdown_to_requests(content: str) -> List[Dict[str, Any]]:
             })
         
         # Bold text within this part
-        for bold_start, bold_end in info["bold_ranges"]:
-            actual_start = start + bold_start
-            actual_end = start + bold_end
+        for actual_start, actual_end in bold_ranges:
             requests.append({
                 "updateTextStyle": {
                     "range": {"startIndex": actual_start, "endIndex": actual_end},
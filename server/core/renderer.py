@@ -2,11 +2,23 @@
 
 import json
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Set
 from datetime import datetime
 
 from .markdown_to_docx import save_markdown_as_docx
 
+try:
+    import regex as _re  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    import re as _re
+
+_NUMERIC_PREFIX_RE = _re.compile(r"^\(?\d+\)?[\.)]\s+")
+_PLACEHOLDER_RE = _re.compile(r"\{\{(\w+)\}\}")
+
+# Characters replaced with '_' when building output filenames
+_FN_SANITIZE = str.maketrans({' ': '_', '/': '_', '\\': '_', ':': '_'})
+_FN_TIMESTAMP_FMT = '%Y%m%d_%H%M%S'
+
 class TemplateRenderer:
     """Handles rendering of scope document templates with extracted variables."""
     
@@ -186,8 +198,7 @@ class TemplateRenderer:
                 t = t[len(prefix):]
                 break
         # Remove numeric prefixes like '1. ', '1) ', '(1) '
-        import re
-        t = re.sub(r"^\(?\d+\)?[\.)]\s+", "", t)
+        t = _NUMERIC_PREFIX_RE.sub("", t)
         t = self._strip_outer_emphasis(t.strip())
         # Remove outer backticks
         if t.startswith("`") and t.endswith("`") and len(t) >= 2:
@@ -251,12 +262,9 @@ class TemplateRenderer:
         sentences = re.split(r"(?<=[.!?])\s+", text)
         return " ".join(sentences[:max_sentences]).strip()
     
-    def _find_remaining_placeholders(self, rendered: str) -> list:
+    def _find_remaining_placeholders(self, rendered: str) -> Set[str]:
         """Find any placeholders that weren't filled."""
-        import re
-        pattern = r'\{\{(\w+)\}\}'
-        matches = re.findall(pattern, rendered)
-        return list(set(matches))
+        return {m.group(1) for m in _PLACEHOLDER_RE.finditer(rendered)}
     
     def save(self, rendered_content: str, output_path: Path) -> None:
         """
@@ -294,11 +302,11 @@ class TemplateRenderer:
         """
         client = variables.get('client_name', 'Unknown_Client')
         project = variables.get('project_name', 'Unknown_Project')
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = datetime.now().strftime(_FN_TIMESTAMP_FMT)
         
         # Clean up for filename
-        client = client.replace(' ', '_').replace('/', '_')
-        project = project.replace(' ', '_').replace('/', '_')
+        client = client.translate(_FN_SANITIZE)
+        project = project.translate(_FN_SANITIZE)
         
         return f"{client}_{project}_TechScope_{timestamp}.md"
 
@@ -2,23 +2,64 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import logging
+import math
+import os
+import random
+import re
+import threading
+import time
 from dataclasses import dataclass
 from enum import Enum
-from typing import Iterable, List, Optional
+from itertools import chain
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
 
 import httpx
 
+try:
+    import h2  # noqa: F401  # enables httpx HTTP/2 support
+    _HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    _HTTP2_AVAILABLE = False
+
 from .config import (
     ENABLE_WEB_RESEARCH,
+    HISTORY_EMBEDDING_MODEL,
     PERPLEXITY_API_KEY,
     PERPLEXITY_BASE_URL,
+    PERPLEXITY_CACHE_DIR,
+    PERPLEXITY_CACHE_TTL_SECONDS,
     PERPLEXITY_MODEL,
+    PERPLEXITY_SEMANTIC_CACHE,
+    PERPLEXITY_SEMANTIC_MAX_ENTRIES,
+    PERPLEXITY_SEMANTIC_THRESHOLD,
 )
+from .history_profiles import ProfileEmbedder
 
 
 logger = logging.getLogger(__name__)
 
+# Separators that end the service name in "Service - detail" style entries
+_SVC_SEP_RE = re.compile(r" - | – |:| via ")
+
+# Only the service name varies, keeping prompts stable for the answer cache
+_SERVICE_VERIFY_TMPL = (
+    "Verify whether '{svc}' provides an official public API suitable for automation. "
+    "Provide links to official documentation and note auth requirements (OAuth, API key, service account). "
+    "If no official API exists, state that clearly and suggest the closest official alternative. "
+    "Use 1-2 sentences and list 1-3 authoritative references."
+)
+
+
+def _unit(vector: Iterable[float]) -> List[float]:
+    values = [float(x) for x in vector]
+    norm = math.sqrt(sum(x * x for x in values)) or 1.0
+    return [x / norm for x in values]
+
 
 class ResearchMode(str, Enum):
     NONE = "none"
@@ -35,67 +76,96 @@ class ResearchFinding:
 
 
 class PerplexityClient:
-    """Minimal Perplexity API wrapper."""
-
-    def __init__(self, api_key: str, *, base_url: str = PERPLEXITY_BASE_URL, model: str = PERPLEXITY_MODEL) -> None:
+    """Minimal Perplexity API wrapper.
+
+    Answers are cached on disk keyed by model + prompt so repeated research
+    within the TTL skips the API round-trip. With semantic caching enabled,
+    prompts whose embedding is close enough to a cached prompt reuse its answer.
+    Prompts are embedded with the history ProfileEmbedder (OpenAI) rather than
+    a local model, and the newest `semantic_max_entries` embeddings are kept.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        *,
+        base_url: str = PERPLEXITY_BASE_URL,
+        model: str = PERPLEXITY_MODEL,
+        cache_root: Optional[Path] = None,
+        cache_ttl: int = PERPLEXITY_CACHE_TTL_SECONDS,
+        no_cache: bool = False,
+        semantic_cache: bool = PERPLEXITY_SEMANTIC_CACHE,
+        semantic_threshold: float = PERPLEXITY_SEMANTIC_THRESHOLD,
+        semantic_max_entries: int = PERPLEXITY_SEMANTIC_MAX_ENTRIES,
+    ) -> None:
         if not api_key:
             raise ValueError("Perplexity API key is required for full research mode")
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
         self.model = model
-
-    def query(self, prompt: str) -> ResearchFinding:
-        url = f"{self.base_url}/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-        }
-        payload = {
-            "model": self.model,
-            "messages": [
-                {"role": "system", "content": "You are a senior solutions architect researching technical feasibility."},
-                {"role": "user", "content": prompt},
-            ],
-            "max_tokens": 800,
-            "temperature": 0.2,
-            "return_citations": True,
-        }
+        self.cache_ttl = cache_ttl
+        self.no_cache = no_cache
+        self.cache_root = (cache_root or PERPLEXITY_CACHE_DIR).resolve()
+        if not no_cache:
+            self.cache_root.mkdir(parents=True, exist_ok=True)
+        self.semantic_threshold = semantic_threshold
+        self.semantic_max_entries = semantic_max_entries
+        self._embedder: Optional[ProfileEmbedder] = None
+        if semantic_cache and not no_cache:
+            embedder = ProfileEmbedder(HISTORY_EMBEDDING_MODEL)
+            if embedder.api_key:
+                self._embedder = embedder
+            else:
+                logger.warning("OPENAI_API_KEY not set; Perplexity semantic cache disabled")
+        self._semantic_index_path = self.cache_root / "semantic_index.jsonl"
+        self._semantic_lock = threading.Lock()
+        # Unit-length index entries, read from disk on first use
+        self._semantic_entries: Optional[List[dict]] = None
+        # Pooled clients are created on first use and then reused, so repeated
+        # queries share their TLS sessions
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+
+    def close(self) -> None:
+        """Close the sync client; an open async client needs :meth:`aclose`."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self) -> None:
+        """Close both clients; call on the event loop that ran the async queries."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        self.close()
+
+    def __enter__(self) -> "PerplexityClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def query(self, prompt: str, *, semantic: bool = True) -> ResearchFinding:
+        """Answer `prompt`; `semantic=False` restricts the cache to exact matches."""
+        cached, embedding = self._cache_load(prompt, semantic)
+        if cached is not None:
+            return cached
+
+        payload = self._build_payload(prompt)
 
         # Simple retry with backoff for transient errors
         attempt = 0
         last_exc: Exception | None = None
         while attempt < 3:
             try:
-                with httpx.Client(timeout=60.0) as client:
-                    response = client.post(url, headers=headers, json=payload)
-                    response.raise_for_status()
-                    data = response.json()
+                response = self._sync_client().post("/chat/completions", json=payload)
+                response.raise_for_status()
+                data = response.json()
                 break
             except (httpx.TimeoutException, httpx.HTTPStatusError) as exc:
-                # Log server response text when available for debuggability (e.g., 400 details)
-                try:
-                    resp = exc.response  # type: ignore[attr-defined]
-                    detail = resp.text if resp is not None else str(exc)
-                except Exception:
-                    detail = str(exc)
-
-                # Only retry on transient errors (429 and 5xx). For 4xx (like 400), do not retry.
-                status = getattr(exc, "response", None).status_code if hasattr(exc, "response") and exc.response is not None else None
-                transient = status in (429, 500, 502, 503, 504) or isinstance(exc, httpx.TimeoutException)
-                if not transient:
-                    logger.warning("Perplexity non-retryable error (%s): %s", status, detail)
-                    raise
-
                 last_exc = exc
                 attempt += 1
-                wait = 1.5 ** attempt
-                logger.warning("Perplexity retry %s after error (%s): %s", attempt, status, detail)
-                try:
-                    import time
-                    time.sleep(wait)
-                except Exception:
-                    pass
+                time.sleep(self._retry_wait(exc, attempt))
             except Exception as exc:
                 # Non-retryable
                 raise
@@ -103,31 +173,277 @@ class PerplexityClient:
         if last_exc and attempt >= 3:
             raise last_exc
 
+        finding = self._parse_response(prompt, data)
+        self._cache_store(finding, embedding)
+        return finding
+
+    async def aquery(
+        self,
+        prompt: str,
+        client: Optional[httpx.AsyncClient] = None,
+        *,
+        semantic: bool = True,
+    ) -> ResearchFinding:
+        """Async variant of :meth:`query`; uses the instance's pooled AsyncClient by default."""
+        if client is None:
+            client = self._get_async_client()
+        # Cache lookup may call the embeddings API, so keep it off the event loop
+        loop = asyncio.get_running_loop()
+        cached, embedding = await loop.run_in_executor(None, self._cache_load, prompt, semantic)
+        if cached is not None:
+            return cached
+
+        payload = self._build_payload(prompt)
+
+        attempt = 0
+        last_exc: Exception | None = None
+        while attempt < 3:
+            try:
+                response = await client.post("/chat/completions", json=payload)
+                response.raise_for_status()
+                data = response.json()
+                break
+            except (httpx.TimeoutException, httpx.HTTPStatusError) as exc:
+                last_exc = exc
+                attempt += 1
+                await asyncio.sleep(self._retry_wait(exc, attempt))
+
+        if last_exc and attempt >= 3:
+            raise last_exc
+
+        finding = self._parse_response(prompt, data)
+        await loop.run_in_executor(None, self._cache_store, finding, embedding)
+        return finding
+
+    async def aquery_many(
+        self,
+        prompts: Sequence[str],
+        *,
+        semantic: bool = True,
+    ) -> List[Union[ResearchFinding, BaseException]]:
+        """Run prompts concurrently over the instance's keep-alive pool.
+
+        Results are returned in prompt order; failed queries yield their exception.
+        """
+        client = self._get_async_client()
+        return await asyncio.gather(
+            *(self.aquery(prompt, client, semantic=semantic) for prompt in prompts),
+            return_exceptions=True,
+        )
+
+    def _sync_client(self) -> httpx.Client:
+        if self._client is None:
+            self._client = httpx.Client(**self._client_options())
+        return self._client
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        # Bound to the loop that first uses it; callers keep to one loop
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(**self._client_options())
+        return self._async_client
+
+    def _client_options(self) -> dict:
+        """Shared settings for the sync and async clients (HTTP/2 when h2 is installed)."""
+        return {
+            "base_url": self.base_url,
+            "http2": _HTTP2_AVAILABLE,
+            "timeout": httpx.Timeout(connect=5.0, read=60.0, write=10.0, pool=5.0),
+            "limits": httpx.Limits(max_connections=20, max_keepalive_connections=20),
+            "headers": {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+            },
+        }
+
+    def _cache_path(self, prompt: str) -> Path:
+        key = hashlib.sha256(f"{self.model}|{prompt}".encode("utf-8")).hexdigest()[:16]
+        return self.cache_root / f"{key}.json"
+
+    def _cache_load(
+        self, prompt: str, semantic: bool = True
+    ) -> Tuple[Optional[ResearchFinding], Optional[List[float]]]:
+        """Exact-match lookup with an optional semantic fallback.
+
+        Also returns the prompt embedding computed on a miss so storing the
+        fresh answer does not embed the prompt a second time.
+        """
+        if self.no_cache:
+            return None, None
+        cache_path = self._cache_path(prompt)
+        try:
+            if time.time() - cache_path.stat().st_mtime > self.cache_ttl:
+                return self._semantic_load(prompt) if semantic else (None, None)
+            with open(cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self._semantic_load(prompt) if semantic else (None, None)
+        finding = ResearchFinding(
+            provider="perplexity",
+            query=prompt,
+            summary=data.get("summary", ""),
+            references=list(data.get("references") or []),
+        )
+        return finding, None
+
+    def _cache_store(self, finding: ResearchFinding, embedding: Optional[List[float]] = None) -> None:
+        if self.no_cache:
+            return
+        cache_path = self._cache_path(finding.query)
+        tmp_path = cache_path.with_suffix(f".tmp.{os.getpid()}")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"summary": finding.summary, "references": finding.references}, f)
+            os.replace(tmp_path, cache_path)
+        except OSError as exc:
+            logger.warning("Unable to cache Perplexity result: %s", exc)
+            return
+        if embedding is not None:
+            self._semantic_store(cache_path, embedding)
+
+    def _embed_prompt(self, prompt: str) -> Optional[List[float]]:
+        if self._embedder is None:
+            return None
+        try:
+            return _unit(self._embedder.embed(prompt))
+        except Exception as exc:  # pragma: no cover - network guard
+            logger.warning("Prompt embedding failed; skipping semantic cache: %s", exc)
+            return None
+
+    def _semantic_index(self) -> List[dict]:
+        """Index entries for this cache; call with the semantic lock held."""
+        if self._semantic_entries is None:
+            entries: List[dict] = []
+            try:
+                with open(self._semantic_index_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue
+                        entry["embedding"] = _unit(entry.get("embedding") or [])
+                        entries.append(entry)
+            except OSError:
+                pass
+            self._semantic_entries = entries[-self.semantic_max_entries:]
+        return self._semantic_entries
+
+    def _semantic_load(self, prompt: str) -> Tuple[Optional[ResearchFinding], Optional[List[float]]]:
+        """Return the cached finding whose prompt embedding is most similar, if close enough."""
+        embedding = self._embed_prompt(prompt)
+        if embedding is None:
+            return None, None
+        with self._semantic_lock:
+            entries = list(self._semantic_index())
+        cutoff = time.time() - self.cache_ttl
+        best_score = self.semantic_threshold
+        best_file: Optional[str] = None
+        for entry in entries:
+            if entry.get("model") != self.model or entry.get("ts", 0) < cutoff:
+                continue
+            # Both sides are unit length, so the dot product is the cosine
+            score = sum(a * b for a, b in zip(embedding, entry["embedding"]))
+            if score >= best_score:
+                best_score = score
+                best_file = entry.get("file")
+        if not best_file:
+            return None, embedding
+        try:
+            with open(self.cache_root / best_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None, embedding
+        logger.info("Perplexity semantic cache hit (similarity %.3f)", best_score)
+        finding = ResearchFinding(
+            provider="perplexity",
+            query=prompt,
+            summary=data.get("summary", ""),
+            references=list(data.get("references") or []),
+        )
+        return finding, None
+
+    def _semantic_store(self, cache_path: Path, embedding: List[float]) -> None:
+        entry = {"model": self.model, "file": cache_path.name, "ts": time.time(), "embedding": embedding}
+        try:
+            with self._semantic_lock:
+                entries = self._semantic_index()
+                entries.append(entry)
+                if len(entries) <= self.semantic_max_entries:
+                    with open(self._semantic_index_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(entry) + "\n")
+                    return
+                # Over the cap: drop expired and oldest entries and rewrite the file
+                cutoff = time.time() - self.cache_ttl
+                entries[:] = [e for e in entries if e.get("ts", 0) >= cutoff][-self.semantic_max_entries:]
+                tmp_path = self._semantic_index_path.with_suffix(f".tmp.{os.getpid()}")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    for kept in entries:
+                        f.write(json.dumps(kept) + "\n")
+                os.replace(tmp_path, self._semantic_index_path)
+        except OSError as exc:
+            logger.warning("Unable to update Perplexity semantic index: %s", exc)
+
+    def _build_payload(self, prompt: str) -> dict:
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": "You are a senior solutions architect researching technical feasibility."},
+                {"role": "user", "content": prompt},
+            ],
+            "max_tokens": 800,
+            "temperature": 0.2,
+            "return_citations": True,
+        }
+
+    def _retry_wait(self, exc: Exception, attempt: int) -> float:
+        """Return the backoff before the next attempt, re-raising non-transient errors."""
+        # Log server response text when available for debuggability (e.g., 400 details)
+        try:
+            resp = exc.response  # type: ignore[attr-defined]
+            detail = resp.text if resp is not None else str(exc)
+        except Exception:
+            detail = str(exc)
+
+        # Only retry on transient errors (429 and 5xx). For 4xx (like 400), do not retry.
+        status = getattr(exc, "response", None).status_code if hasattr(exc, "response") and exc.response is not None else None
+        transient = status in (429, 500, 502, 503, 504) or isinstance(exc, httpx.TimeoutException)
+        if not transient:
+            logger.warning("Perplexity non-retryable error (%s): %s", status, detail)
+            raise exc
+
+        # Full-jitter exponential backoff so concurrent callers do not retry in lockstep
+        cap, base = 20.0, 0.5
+        wait = random.uniform(0, min(cap, base * (2 ** attempt)))
+        retry_after = exc.response.headers.get("Retry-After") if status else None
+        if retry_after:
+            try:
+                wait = max(wait, float(retry_after) + random.uniform(0, 0.5))
+            except ValueError:
+                pass
+        logger.warning("Perplexity retry %s in %.1fs after error (%s): %s", attempt, wait, status, detail)
+        return wait
+
+    def _parse_response(self, prompt: str, data: dict) -> ResearchFinding:
         message = (data.get("choices", [{}])[0] or {}).get("message", {})
         content = message.get("content", "") or ""
 
-        # Collect citations from multiple possible locations
-        refs: List[str] = []
-        def _collect_citations(obj) -> None:
-            items = obj or []
-            for item in items:
-                if isinstance(item, dict):
-                    ref = item.get("url") or item.get("citation")
-                    if ref:
-                        refs.append(str(ref))
-                elif isinstance(item, str):
-                    refs.append(item)
-
-        _collect_citations(message.get("citations"))
-        _collect_citations(data.get("citations"))
-
-        # De-duplicate while preserving order
+        # Collect citations from multiple possible locations, de-duplicating
+        # while preserving order
         seen = set()
         unique_refs: List[str] = []
-        for r in refs:
-            if r not in seen:
-                seen.add(r)
-                unique_refs.append(r)
+        for item in chain(message.get("citations") or [], data.get("citations") or []):
+            if isinstance(item, dict):
+                ref = item.get("url") or item.get("citation")
+                if not ref:
+                    continue
+                ref = str(ref)
+            elif isinstance(item, str):
+                ref = item
+            else:
+                continue
+            if ref not in seen:
+                seen.add(ref)
+                unique_refs.append(ref)
 
         return ResearchFinding(
             provider="perplexity",
@@ -151,6 +467,33 @@ class ResearchManager:
                     self.perplexity_client = PerplexityClient(PERPLEXITY_API_KEY)
                 except Exception as exc:  # pragma: no cover - initialization guard
                     logger.warning("Unable to initialize Perplexity client: %s", exc)
+        # The sync entry points share one loop so the pooled AsyncClient is
+        # reused across them instead of being rebuilt per asyncio.run call
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def close(self) -> None:
+        """Release pooled connections held by the Perplexity client."""
+        if self._loop is not None:
+            try:
+                if self.perplexity_client is not None:
+                    self._loop.run_until_complete(self.perplexity_client.aclose())
+                self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+            finally:
+                self._loop.close()
+                self._loop = None
+        elif self.perplexity_client is not None:
+            self.perplexity_client.close()
+
+    def _run(self, coro):
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coro)
+
+    def __enter__(self) -> "ResearchManager":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def allows_web_search_tool(self) -> bool:
         if self.mode is ResearchMode.NONE:
@@ -165,16 +508,22 @@ class ResearchManager:
         if self.mode is not ResearchMode.FULL or not self.perplexity_client:
             return []
 
+        return self._run(self.agather_research(context_pack, project_focus))
+
+    async def agather_research(self, context_pack: dict, project_focus: Optional[str] = None) -> List[ResearchFinding]:
+        if self.mode is not ResearchMode.FULL or not self.perplexity_client:
+            return []
+
         queries = self._build_queries(context_pack, project_focus)
         findings: List[ResearchFinding] = []
-        for query in queries:
-            try:
-                finding = self.perplexity_client.query(query)
-                findings.append(finding)
-            except httpx.HTTPError as http_err:  # pragma: no cover - network guard
-                logger.warning("Perplexity request failed for '%s': %s", query, http_err)
-            except Exception as exc:  # pragma: no cover - resilience
-                logger.warning("Unexpected Perplexity error for '%s': %s", query, exc)
+        results = await self.perplexity_client.aquery_many(queries)
+        for query, result in zip(queries, results):
+            if isinstance(result, httpx.HTTPError):  # pragma: no cover - network guard
+                logger.warning("Perplexity request failed for '%s': %s", query, result)
+            elif isinstance(result, BaseException):  # pragma: no cover - resilience
+                logger.warning("Unexpected Perplexity error for '%s': %s", query, result)
+            else:
+                findings.append(result)
         return findings
 
     # ----- Post-extraction research -----
@@ -186,54 +535,49 @@ class ResearchManager:
         if self.mode is not ResearchMode.FULL or not self.perplexity_client:
             return []
 
+        return self._run(self.agather_post_extraction(variables))
+
+    async def agather_post_extraction(self, variables: dict) -> List[ResearchFinding]:
+        if self.mode is not ResearchMode.FULL or not self.perplexity_client:
+            return []
+
         queries = self._build_post_queries(variables)
         findings: List[ResearchFinding] = []
-        for query in queries:
-            try:
-                findings.append(self.perplexity_client.query(query))
-            except Exception as exc:  # pragma: no cover - network guard
-                logger.warning("Perplexity post-extraction query failed: %s", exc)
+        # Verification prompts differ only in the service name, so a close
+        # embedding says nothing about the answer; match them exactly
+        for result in await self.perplexity_client.aquery_many(queries, semantic=False):
+            if isinstance(result, BaseException):  # pragma: no cover - network guard
+                logger.warning("Perplexity post-extraction query failed: %s", result)
+            else:
+                findings.append(result)
         return findings
 
     def _build_post_queries(self, variables: dict) -> List[str]:
         services: List[str] = []
-
-        def _add_service_from_text(text: str) -> None:
-            raw = (text or "").strip()
-            if not raw:
-                return
+        seen: set = set()
+        items = chain(
+            variables.get("tech_stack") or [],
+            variables.get("integration_points") or [],
+            variables.get("data_sources") or [],
+        )
+        for item in items:
+            if not isinstance(item, str):
+                continue
+            raw = item.strip()
             # Extract service name before '-' or ':' or ' via '
-            for sep in [" - ", " – ", ":", " via "]:
-                if sep in raw:
-                    raw = raw.split(sep, 1)[0].strip()
-                    break
-            if raw and raw not in services:
-                services.append(raw)
-
-        for item in (variables.get("tech_stack") or []):
-            if isinstance(item, str):
-                _add_service_from_text(item)
-        for item in (variables.get("integration_points") or []):
-            if isinstance(item, str):
-                _add_service_from_text(item)
-        for item in (variables.get("data_sources") or []):
-            if isinstance(item, str):
-                _add_service_from_text(item)
-
-        # Limit the number of services to keep calls bounded
-        services = services[:6]
+            match = _SVC_SEP_RE.search(raw)
+            if match:
+                raw = raw[:match.start()].strip()
+            key = raw.casefold()
+            if not raw or key in seen:
+                continue
+            seen.add(key)
+            services.append(raw)
+            # Limit the number of services to keep calls bounded
+            if len(services) == 6:
+                break
 
-        queries: List[str] = []
-        for svc in services:
-            queries.append(
-                (
-                    f"Verify whether '{svc}' provides an official public API suitable for automation. "
-                    f"Provide links to official documentation and note auth requirements (OAuth, API key, service account). "
-                    f"If no official API exists, state that clearly and suggest the closest official alternative. "
-                    f"Use 1-2 sentences and list 1-3 authoritative references."
-                )
-            )
-        return queries
+        return [_SERVICE_VERIFY_TMPL.format(svc=svc) for svc in services]
 
     def _build_queries(self, context_pack: dict, project_focus: Optional[str]) -> List[str]:
         queries: List[str] = []
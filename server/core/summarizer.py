@@ -4,16 +4,77 @@ from __future__ import annotations
 
 import base64
 import hashlib
+import io
 import json
 import os
+import random
+import re
+import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-from .config import OUTPUT_DIR, MAX_TOKENS, TEMPERATURE
+from .config import ANTHROPIC_FILES_API_ENABLED, OUTPUT_DIR, MAX_TOKENS, TEMPERATURE
 from .llm import ClaudeExtractor
 
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """Parse JSON with orjson when installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON with the two-space layout used for summaries."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode('utf-8')
+
+# Multiple of 3 bytes so base64 chunks concatenate without padding
+_B64_CHUNK_SIZE = 57 * 1024
+
+_FILES_API_BETA = "files-api-2025-04-14"
+
+# Content beyond this many characters is elided from the middle of the prompt
+MAX_CONTENT_CHARS = 200_000
+
+_SYSTEM_INSTRUCTIONS = (
+    "You are a senior solutions architect. Summarize files for technical scope planning. "
+    "Produce strictly valid JSON matching the schema instructed. Preserve key evidence via quotes."
+)
+
+_JSON_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+_JSON_DECODER = json.JSONDecoder()
+
+# Static schema shown to the model; serialized once at import
+_SUMMARY_SCHEMA_JSON = json.dumps(
+    {
+        "filename": "string",
+        "purpose": "string",
+        "key_entities": ["string"],
+        "pain_points": [
+            {"description": "string", "severity": "low|medium|high", "evidence_refs": ["int"]}
+        ],
+        "risks": ["string"],
+        "integration_complexity": "string",
+        "unknowns": ["string"],
+        "effort_multipliers": ["string"],
+        "must_read_sections": ["string"],
+        "evidence_quotes": [
+            {"quote": "string", "rationale": "string", "approx_location": "string"}
+        ],
+        "importance_score": 0,
+    },
+    indent=2,
+)
+
 
 @dataclass
 class FileSummary:
@@ -29,10 +90,21 @@ class FileSummarizer:
     Caches summaries by content hash to avoid reprocessing unchanged files.
     """
 
-    def __init__(self, extractor: ClaudeExtractor, cache_root: Optional[Path] = None) -> None:
+    def __init__(
+        self,
+        extractor: ClaudeExtractor,
+        cache_root: Optional[Path] = None,
+        max_in_flight: int = 4,
+    ) -> None:
         self.extractor = extractor
         self.cache_root = (cache_root or (OUTPUT_DIR / "artifacts" / "summaries")).resolve()
         self.cache_root.mkdir(parents=True, exist_ok=True)
+        # Caps concurrent Anthropic requests across all threads using this summarizer
+        self._request_slots = threading.Semaphore(max_in_flight)
+        # content_hash -> Anthropic file_id for attachments already uploaded
+        self._file_ids_path = self.cache_root / "file_ids.json"
+        self._file_ids: Optional[Dict[str, str]] = None
+        self._file_ids_lock = threading.Lock()
 
     def summarize_file(
         self,
@@ -41,16 +113,18 @@ class FileSummarizer:
         project_focus: Optional[str] = None,
         file_note: Optional[str] = None,
     ) -> FileSummary:
+        # Encode once for both the size and the content hash
+        encoded = content.encode("utf-8", errors="ignore")
         doc_stub = {
             "filename": filename,
             "content": content,
             "path": None,
             "media_type": "text/plain",
             "source_type": "text",
-            "size_bytes": len(content.encode("utf-8", errors="ignore")),
+            "size_bytes": len(encoded),
             "upload_via": "text",
             "can_upload": False,
-            "content_hash": self._hash_text(content),
+            "content_hash": hashlib.sha256(encoded).hexdigest(),
         }
         return self.summarize_document(
             document=doc_stub,
@@ -64,49 +138,91 @@ class FileSummarizer:
         project_focus: Optional[str] = None,
         file_note: Optional[str] = None,
     ) -> FileSummary:
+        cache_path, cached = self._cache_lookup(document, project_focus, file_note)
+        if cached is not None:
+            return cached
+        return self._summarize_uncached(document, project_focus, file_note, cache_path)
+
+    def _cache_lookup(
+        self,
+        document: Dict[str, Any],
+        project_focus: Optional[str],
+        file_note: Optional[str],
+    ) -> Tuple[Path, Optional[FileSummary]]:
+        """Return the cache path for a document and its cached summary, if any."""
         filename = document.get("filename", "unknown")
-        content = document.get("content", "")
         cache_key = self._make_cache_key(
             filename,
-            content,
+            document.get("content", ""),
             project_focus,
             file_note,
             document.get("content_hash"),
         )
         cache_path = self.cache_root / f"{self._sanitize_name(filename)}.{cache_key}.json"
-        if cache_path.exists():
-            try:
-                with open(cache_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                return FileSummary(filename=filename, summary=data, cache_path=cache_path)
-            except Exception:
-                pass
+        try:
+            data = json_loads(cache_path.read_bytes())
+            return cache_path, FileSummary(filename=filename, summary=data, cache_path=cache_path)
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            # Truncated or corrupt entry: drop it so the fresh result replaces it
+            cache_path.unlink(missing_ok=True)
+        except Exception:
+            pass
+        return cache_path, None
 
-        prompt = self._build_prompt(document, project_focus, file_note)
-        message_content = self._build_message_content(document, prompt)
+    def _summarize_uncached(
+        self,
+        document: Dict[str, Any],
+        project_focus: Optional[str],
+        file_note: Optional[str],
+        cache_path: Path,
+    ) -> FileSummary:
+        filename = document.get("filename", "unknown")
+        content = document.get("content", "")
+        if len(content) > MAX_CONTENT_CHARS:
+            half = MAX_CONTENT_CHARS // 2
+            content = content[:half] + "\n...[TRUNCATED]...\n" + content[-half:]
+        prompt = self._build_prompt(document, project_focus, file_note, content)
+        file_id = self._get_file_id(document)
+        message_content = self._build_message_content(document, prompt, file_id)
 
         # Exponential backoff for rate limits/errors
         attempt = 0
         while True:
             try:
-                response = self.extractor.client.messages.create(
+                request = dict(
                     model=self.extractor.model,
                     max_tokens=min(4000, MAX_TOKENS),
                     temperature=max(0.1, TEMPERATURE),
                     system=self._system_instructions(),
                     messages=[{"role": "user", "content": message_content}],
                 )
+                with self._request_slots:
+                    if file_id:
+                        response = self.extractor.client.beta.messages.create(
+                            **request, betas=[_FILES_API_BETA]
+                        )
+                    else:
+                        response = self.extractor.client.messages.create(**request)
                 text = response.content[0].text
                 summary = self._parse_json(text)
 
-                with open(cache_path, 'w', encoding='utf-8') as f:
-                    json.dump(summary, f, indent=2)
+                self._write_cache(cache_path, summary)
                 return FileSummary(filename=filename, summary=summary, cache_path=cache_path)
 
             except Exception as e:
                 msg = str(e)
                 if 'rate_limit' in msg or '429' in msg:
-                    wait = min(20, 5 * (2 ** attempt))
+                    # Full-jitter backoff, honouring Retry-After when the API sends one
+                    wait = round(random.uniform(0, min(20, 5 * (2 ** attempt))), 1)
+                    headers = getattr(getattr(e, 'response', None), 'headers', None) or {}
+                    retry_after = headers.get('retry-after')
+                    if retry_after:
+                        try:
+                            wait = max(wait, float(retry_after) + random.uniform(0, 0.5))
+                        except ValueError:
+                            pass
                     print(f"[WARN] Rate limit while summarizing {filename}. Retrying in {wait}s (attempt {attempt+1})")
                     time.sleep(wait)
                     attempt += 1
@@ -114,41 +230,42 @@ class FileSummarizer:
                         print(f"[ERROR] Failed to summarize {filename} due to repeated rate limits; returning minimal stub")
                         return FileSummary(filename=filename, summary=self._minimal_stub(filename), cache_path=None)
                     continue
+                elif file_id and getattr(e, 'status_code', None) in (400, 404):
+                    # The uploaded file may have expired or been deleted; resend inline
+                    print(f"[WARN] File reference failed for {filename} ({e}); retrying with inline upload")
+                    self._forget_file_id(document)
+                    file_id = None
+                    message_content = self._build_message_content(document, prompt)
+                    continue
                 else:
                     print(f"[ERROR] Failed to summarize {filename}: {e}")
                     return FileSummary(filename=filename, summary=self._minimal_stub(filename), cache_path=None)
 
+    def _write_cache(self, cache_path: Path, summary: Dict[str, Any]) -> None:
+        """Write a cache entry atomically so readers never see a partial file."""
+        tmp_path = cache_path.with_suffix(f"{cache_path.suffix}.tmp.{os.getpid()}.{threading.get_ident()}")
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(json_dumps(summary))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, cache_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
     def _system_instructions(self) -> str:
-        return (
-            "You are a senior solutions architect. Summarize files for technical scope planning. "
-            "Produce strictly valid JSON matching the schema instructed. Preserve key evidence via quotes."
-        )
+        return _SYSTEM_INSTRUCTIONS
 
     def _build_prompt(
         self,
         document: Dict[str, Any],
         project_focus: Optional[str],
         file_note: Optional[str],
+        content: Optional[str] = None,
     ) -> str:
         filename = document.get("filename", "unknown")
-        content = document.get("content", "")
-        schema = {
-            "filename": "string",
-            "purpose": "string",
-            "key_entities": ["string"],
-            "pain_points": [
-                {"description": "string", "severity": "low|medium|high", "evidence_refs": ["int"]}
-            ],
-            "risks": ["string"],
-            "integration_complexity": "string",
-            "unknowns": ["string"],
-            "effort_multipliers": ["string"],
-            "must_read_sections": ["string"],
-            "evidence_quotes": [
-                {"quote": "string", "rationale": "string", "approx_location": "string"}
-            ],
-            "importance_score": 0,
-        }
+        if content is None:
+            content = document.get("content", "")
 
         header = []
         if project_focus:
@@ -175,23 +292,31 @@ class FileSummarizer:
             + "Focus on: pain points, risks, integration complexity, unknowns, and what increases effort.\n"
             + "Include 3-10 evidence quotes from the content with brief rationale and approximate location.\n"
             + "Return strictly valid JSON matching this schema (and nothing else):\n"
-            + json.dumps(schema, indent=2)
+            + _SUMMARY_SCHEMA_JSON
             + "\n\nCONTENT:\n"
             + content
         )
 
-    def _build_message_content(self, document: Dict[str, Any], prompt: str) -> List[Dict[str, Any]]:
+    def _build_message_content(
+        self,
+        document: Dict[str, Any],
+        prompt: str,
+        file_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
         blocks: List[Dict[str, Any]] = []
 
         if document.get("can_upload") and document.get("upload_via") == 'attachment':
             path = document.get("path")
             media_type = document.get("media_type", "application/octet-stream")
-            if path:
+            attachment_type = 'image' if media_type.startswith('image/') else 'document'
+            if file_id:
+                blocks.append({
+                    "type": attachment_type,
+                    "source": {"type": "file", "file_id": file_id},
+                })
+            elif path:
                 try:
                     data_b64 = self._encode_base64(Path(path))
-                    attachment_type = 'document'
-                    if media_type.startswith('image/'):
-                        attachment_type = 'image'
                     blocks.append({
                         "type": attachment_type,
                         "source": {
@@ -206,30 +331,107 @@ class FileSummarizer:
         blocks.append({"type": "text", "text": prompt})
         return blocks
 
+    def _get_file_id(self, document: Dict[str, Any]) -> Optional[str]:
+        """Return a Files API id for the attachment, uploading it on first use.
+
+        Returns None when the Files API is disabled, unsupported by the installed
+        SDK, or the upload fails, in which case callers fall back to base64.
+        """
+        if not ANTHROPIC_FILES_API_ENABLED:
+            return None
+        if not (document.get("can_upload") and document.get("upload_via") == 'attachment'):
+            return None
+        path = document.get("path")
+        files_api = getattr(getattr(self.extractor.client, "beta", None), "files", None)
+        if not path or files_api is None:
+            return None
+
+        key = document.get("content_hash") or self._hash_text(Path(path))
+        with self._file_ids_lock:
+            file_ids = self._load_file_ids()
+            if key in file_ids:
+                return file_ids[key]
+
+        media_type = document.get("media_type", "application/octet-stream")
+        try:
+            with open(path, 'rb') as f:
+                uploaded = files_api.upload(
+                    file=(document.get("filename") or Path(path).name, f, media_type),
+                    betas=[_FILES_API_BETA],
+                )
+        except Exception as exc:
+            print(f"[WARN] Files API upload failed for {document.get('filename')}: {exc}")
+            return None
+
+        with self._file_ids_lock:
+            file_ids = self._load_file_ids()
+            file_ids[key] = uploaded.id
+            self._write_cache(self._file_ids_path, file_ids)
+        return uploaded.id
+
+    def _forget_file_id(self, document: Dict[str, Any]) -> None:
+        path = document.get("path")
+        key = document.get("content_hash") or (self._hash_text(Path(path)) if path else None)
+        with self._file_ids_lock:
+            file_ids = self._load_file_ids()
+            if key and file_ids.pop(key, None) is not None:
+                self._write_cache(self._file_ids_path, file_ids)
+
+    def _load_file_ids(self) -> Dict[str, str]:
+        if self._file_ids is None:
+            try:
+                self._file_ids = json_loads(self._file_ids_path.read_bytes())
+            except (OSError, ValueError):
+                self._file_ids = {}
+        return self._file_ids
+
     def _encode_base64(self, path: Path) -> str:
+        # Encode in 3-byte-aligned chunks so no padding appears mid-stream and the
+        # raw file never has to be held in memory alongside its encoding.
+        buf = io.BytesIO()
         with open(path, 'rb') as f:
-            return base64.standard_b64encode(f.read()).decode('utf-8')
+            while True:
+                chunk = f.read(_B64_CHUNK_SIZE)
+                if not chunk:
+                    break
+                buf.write(base64.standard_b64encode(chunk))
+        return buf.getvalue().decode('ascii')
 
-    def _hash_text(self, text: str) -> str:
+    def _hash_text(self, text: Union[str, Path]) -> str:
+        if isinstance(text, Path):
+            with open(text, 'rb') as f:
+                if hasattr(hashlib, 'file_digest'):
+                    return hashlib.file_digest(f, 'sha256').hexdigest()
+                hasher = hashlib.sha256()
+                for chunk in iter(lambda: f.read(_B64_CHUNK_SIZE), b""):
+                    hasher.update(chunk)
+                return hasher.hexdigest()
         hasher = hashlib.sha256()
         hasher.update(text.encode('utf-8', errors='ignore'))
         return hasher.hexdigest()
 
     def _parse_json(self, text: str) -> Dict[str, Any]:
-        t = text.strip()
+        t = _JSON_FENCE_RE.sub("", text.strip())
         if t.startswith('{') and t.endswith('}'):
-            return json.loads(t)
-        fence = t.find("```json")
-        if fence != -1:
-            fence_end = t.find("```", fence + 7)
-            if fence_end != -1:
-                return json.loads(t[fence + 7:fence_end].strip())
-        start = t.find('{')
-        end = t.rfind('}')
-        if start != -1 and end != -1 and end > start:
-            return json.loads(t[start:end + 1])
-        # Fallback minimal
-        return self._minimal_stub("unknown")
+            try:
+                return json_loads(t)
+            except ValueError:
+                pass
+        # Decode the first complete object, starting from each '{' in turn so
+        # braces inside prose or trailing text cannot skew the slice.
+        idx = t.find('{')
+        if idx == -1:
+            # Fallback minimal
+            return self._minimal_stub("unknown")
+        last_error: Optional[ValueError] = None
+        while idx != -1:
+            try:
+                obj, _ = _JSON_DECODER.raw_decode(t, idx)
+                return obj
+            except ValueError as exc:
+                last_error = exc
+            idx = t.find('{', idx + 1)
+        raise last_error
 
     def _minimal_stub(self, filename: str) -> Dict[str, Any]:
         return {
@@ -256,13 +458,16 @@ class FileSummarizer:
     ) -> str:
         h = hashlib.sha256()
         h.update(filename.encode('utf-8', errors='ignore'))
-        h.update(content.encode('utf-8', errors='ignore'))
+        # A precomputed content hash already identifies the content; only
+        # hash the full text when the caller did not supply one.
+        if not content_hash:
+            h.update(content.encode('utf-8', errors='ignore'))
         if project_focus:
             h.update(project_focus.encode('utf-8', errors='ignore'))
         if file_note:
             h.update(file_note.encode('utf-8', errors='ignore'))
         if content_hash:
-            h.update(content_hash.encode('utf-8', errors='ignore'))
+            h.update(content_hash.encode('ascii', errors='ignore'))
         return h.hexdigest()[:16]
 
     def _sanitize_name(self, name: str) -> str:
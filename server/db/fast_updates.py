@@ -0,0 +1,49 @@
+"""Single-statement UPDATE helpers for hot run/step status writes.
+
+These bypass the load-then-flush ORM path: one UPDATE round trip instead
+of a SELECT followed by an UPDATE, with no object materialisation.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from . import models
+
+
+def update_run(session: Session, run_id: UUID, **values: Any) -> int:
+    """Set columns on a run by primary key; returns the number of rows updated."""
+    if not values:
+        return 0
+    stmt = (
+        update(models.Run)
+        .where(models.Run.id == run_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return session.execute(stmt).rowcount
+
+
+def finish_run_step(
+    session: Session,
+    step_id: UUID,
+    status: str,
+    finished_at: datetime,
+    logs: Optional[str] = None,
+) -> int:
+    """Mark a run step finished; `logs` is only written when provided."""
+    values: dict[str, Any] = {"status": status, "finished_at": finished_at}
+    if logs:
+        values["logs"] = logs
+    stmt = (
+        update(models.RunStep)
+        .where(models.RunStep.id == step_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return session.execute(stmt).rowcount
@@ -10,22 +10,24 @@ from sqlalchemy import (
     BigInteger,
     Boolean,
     DateTime,
+    FetchedValue,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
+    func,
+    text,
 )
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from pgvector.sqlalchemy import Vector as VectorType
-
-from .session import Base
+from pgvector.sqlalchemy import HALFVEC
 
+from server.core.config import HISTORY_EMBEDDING_DIMENSIONS
 
-def utcnow() -> datetime:
-    return datetime.utcnow()
+from .session import Base
 
 
 class User(Base):
@@ -34,7 +36,7 @@ class User(Base):
     id: Mapped[UUID_t] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     email: Mapped[str] = mapped_column(String(320), unique=True, nullable=False)
     password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), default=utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     google_tokens: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
     preferences: Mapped[dict] = mapped_column(JSONB, default=dict, nullable=False, server_default="{}")
 
@@ -44,11 +46,12 @@ class User(Base):
 
 class Team(Base):
     __tablename__ = "teams"
+    __table_args__ = (Index("ix_teams_owner_id", "owner_id"),)
 
     id: Mapped[UUID_t] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     name: Mapped[str] = mapped_column(String(200), nullable=False)
     owner_id: Mapped[UUID_t] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), default=utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     settings: Mapped[dict] = mapped_column(JSONB, default=dict, nullable=False)
 
     owner: Mapped["User"] = relationship("User")
@@ -58,11 +61,13 @@ class Team(Base):
 
 class TeamMember(Base):
     __tablename__ = "team_members"
+    # team_id is covered by the composite primary key
+    __table_args__ = (Index("ix_team_members_user_id", "user_id"),)
 
     team_id: Mapped[UUID_t] = mapped_column(UUID(as_uuid=True), ForeignKey("teams.id", ondelete="CASCADE"), primary_key=True)
     user_id: Mapped[UUID_t] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
     role: Mapped[str] = mapped_column(String(50), nullable=False, default="member")
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), default=utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     team: Mapped["Team"] = relationship("Team", back_populates="members")
     user: Mapped["User"] = relationship("User", back_populates="teams")
@@ -70,6 +75,10 @@ class TeamMember(Base):
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        Index("ix_projects_owner_id", "owner_id"),
+        Index("ix_projects_team_id", "team_id"),
+    )
 
     id: Mapped[str] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     owner_id: Mapped[Optional[UUID_t]] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
@@ -77,8 +86,8 @@ class Project(Base):
     name: Mapped[str] = mapped_column(String(200), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     flags: Mapped[dict] = mapped_column(JSONB, default=dict, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), default=utcnow, nullable=False)
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), default=utcnow, onupdate=utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue(), nullable=False)
 
     owner: Mapped[Optional[User]] = relationship("User", back_populates="projects")
     team: Mapped[Optional[Team]] = relationship("Team", back_populates="projects")
@@ -88,6 +97,11 @@ class Project(Base):
 
 class ProjectFile(Base):
     __tablename__ = "project_files"
+    __table_args__ = (
+        Index("ix_project_files_project_id", "project_id"),
+        # Finds earlier uploads of identical bytes within a project to reuse their analysis
+        Index("ix_project_files_checksum", "project_id", "checksum"),
+    )
 
     id: Mapped[str] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     project_id: Mapped[UUID_t] = mapped_column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
@@ -96,7 +110,7 @@ class ProjectFile(Base):
     size: Mapped[int] = mapped_column(BigInteger, nullable=False)
     media_type: Mapped[Optional[str]] = mapped_column(String(120), nullable=True)
     checksum: Mapped[str] = mapped_column(String(64), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), default=utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     token_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     is_summarized: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     summary_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -104,6 +118,8 @@ class ProjectFile(Base):
     pdf_page_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     use_summary_for_generation: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     native_token_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # True when native_token_count is an estimate rather than an API count
+    native_token_count_estimated: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default="false")
     summary_token_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
 
     project: Mapped[Project] = relationship("Project", back_populates="files")
@@ -111,6 +127,14 @@ class ProjectFile(Base):
 
 class Run(Base):
     __tablename__ = "runs"
+    __table_args__ = (
+        # Serves both the project_id FK and the per-project listing ordered by created_at
+        Index("ix_runs_project_created", "project_id", "created_at"),
+        Index("ix_runs_parent_run_id", "parent_run_id"),
+        Index("ix_runs_extracted_variables_artifact_id", "extracted_variables_artifact_id"),
+        # Append-only, so created_at follows physical order; BRIN serves range scans
+        Index("ix_runs_created_brin", "created_at", postgresql_using="brin", postgresql_with={"pages_per_range": 32}),
+    )
 
     id: Mapped[UUID_t] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     project_id: Mapped[UUID_t] = mapped_column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
@@ -118,13 +142,12 @@ class Run(Base):
     research_mode: Mapped[str] = mapped_column(String(20), nullable=False)
     template_type: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), default=utcnow, nullable=False)
-    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=False), nullable=True)
-    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=False), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     params: Mapped[dict] = mapped_column(JSONB, default=dict, nullable=False)
     error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     result_path: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    included_file_ids: Mapped[List[str]] = mapped_column(JSONB, default=list, nullable=False)
     instructions: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     extracted_variables_artifact_id: Mapped[Optional[UUID_t]] = mapped_column(
         UUID(as_uuid=True), ForeignKey("artifacts.id", ondelete="SET NULL"), nullable=True
@@ -141,47 +164,83 @@ class Run(Base):
         cascade="all, delete-orphan",
         foreign_keys="Artifact.run_id",
     )
+    # Request paths work with the *_id columns; an accidental lazy load here
+    # would be a hidden per-row query, so it raises instead (use selectinload).
     parent_run: Mapped[Optional["Run"]] = relationship(
         "Run",
         remote_side="Run.id",
         backref="child_runs",
+        lazy="raise",
     )
     extracted_variables_artifact: Mapped[Optional["Artifact"]] = relationship(
         "Artifact",
         foreign_keys=[extracted_variables_artifact_id],
         post_update=True,
+        lazy="raise",
     )
     versions: Mapped[List["RunVersion"]] = relationship("RunVersion", back_populates="run", cascade="all, delete-orphan")
+    # Loaded with the run: every response serialises the included ids
+    included_file_links: Mapped[List["RunIncludedFile"]] = relationship(
+        "RunIncludedFile",
+        cascade="all, delete-orphan",
+        lazy="selectin",
+    )
+    included_files: Mapped[List["ProjectFile"]] = relationship(
+        "ProjectFile",
+        secondary="run_included_files",
+        viewonly=True,
+    )
+
+    @property
+    def included_file_ids(self) -> List[str]:
+        return [str(link.file_id) for link in self.included_file_links]
+
+
+class RunIncludedFile(Base):
+    __tablename__ = "run_included_files"
+    # run_id is covered by the composite primary key
+    __table_args__ = (Index("ix_run_included_files_file_id", "file_id"),)
+
+    run_id: Mapped[UUID_t] = mapped_column(UUID(as_uuid=True), ForeignKey("runs.id", ondelete="CASCADE"), primary_key=True)
+    file_id: Mapped[UUID_t] = mapped_column(UUID(as_uuid=True), ForeignKey("project_files.id", ondelete="CASCADE"), primary_key=True)
 
 
 class RunVersion(Base):
     """Stores versions of run outputs for in-place regeneration."""
     __tablename__ = "run_versions"
+    __table_args__ = (Index("ix_run_versions_run_id", "run_id"),)
 
     id: Mapped[UUID_t] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     run_id: Mapped[UUID_t] = mapped_column(UUID(as_uuid=True), ForeignKey("runs.id", ondelete="CASCADE"), nullable=False)
     version_number: Mapped[float] = mapped_column(Float, nullable=False)
-    markdown: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Full document bodies are deferred: most queries only need version_number.
+    # Readers opt in with undefer_group("content").
+    markdown: Mapped[Optional[str]] = mapped_column(Text, nullable=True, deferred=True, deferred_group="content")
     feedback: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
     questions_for_expert: Mapped[Optional[List[str]]] = mapped_column(JSONB, nullable=True)
     questions_for_client: Mapped[Optional[List[str]]] = mapped_column(JSONB, nullable=True)
     graphic_path: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), default=utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     # Store the context/answers that triggered this regeneration
-    regen_context: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    regen_context: Mapped[Optional[str]] = mapped_column(Text, nullable=True, deferred=True, deferred_group="content")
 
     run: Mapped[Run] = relationship("Run", back_populates="versions")
 
 
 class RunStep(Base):
     __tablename__ = "run_steps"
+    __table_args__ = (
+        Index("ix_run_steps_run_id", "run_id"),
+        # Steps are inserted with started_at set, so it tracks insertion order
+        Index("ix_run_steps_started_brin", "started_at", postgresql_using="brin", postgresql_with={"pages_per_range": 32}),
+    )
 
     id: Mapped[UUID_t] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     run_id: Mapped[UUID_t] = mapped_column(UUID(as_uuid=True), ForeignKey("runs.id", ondelete="CASCADE"), nullable=False)
     name: Mapped[str] = mapped_column(String(120), nullable=False)
     status: Mapped[str] = mapped_column(String(20), nullable=False)
-    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=False), nullable=True)
-    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=False), nullable=True)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     logs: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
     run: Mapped[Run] = relationship("Run", back_populates="steps")
@@ -189,13 +248,18 @@ class RunStep(Base):
 
 class Artifact(Base):
     __tablename__ = "artifacts"
+    __table_args__ = (
+        # Artifacts are always fetched per run, ordered by created_at
+        Index("ix_artifacts_run_created", "run_id", "created_at"),
+        Index("ix_artifacts_created_brin", "created_at", postgresql_using="brin", postgresql_with={"pages_per_range": 32}),
+    )
 
     id: Mapped[UUID_t] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     run_id: Mapped[UUID_t] = mapped_column(UUID(as_uuid=True), ForeignKey("runs.id", ondelete="CASCADE"), nullable=False)
     kind: Mapped[str] = mapped_column(String(40), nullable=False)
     path: Mapped[str] = mapped_column(Text, nullable=False)
     meta: Mapped[dict] = mapped_column(JSONB, default=dict, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), default=utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     run: Mapped[Run] = relationship(
         "Run",
@@ -206,14 +270,29 @@ class Artifact(Base):
 
 class EmbeddingRecord(Base):
     __tablename__ = "scope_embeddings"
+    __table_args__ = (
+        # Run-scoped lookups probe a single scalar key; a B-tree on the
+        # expression stays far smaller than a GIN over every metadata value.
+        Index("ix_scope_embeddings_run_id", text("(metadata->>'run_id')")),
+        # Same name as the index the vector store bootstraps
+        Index("idx_scope_embeddings_project", "project_id"),
+        Index(
+            "ix_scope_embeddings_hnsw",
+            "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "halfvec_cosine_ops"},
+        ),
+        Index("ix_scope_embeddings_created_brin", "created_at", postgresql_using="brin", postgresql_with={"pages_per_range": 32}),
+    )
 
     id: Mapped[UUID_t] = mapped_column(UUID(as_uuid=True), primary_key=True)
     project_id: Mapped[Optional[UUID_t]] = mapped_column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="SET NULL"), nullable=True)
     doc_kind: Mapped[str] = mapped_column(String(40), nullable=False)
-    embedding: Mapped[List[float]] = mapped_column(VectorType, nullable=False)
+    embedding: Mapped[List[float]] = mapped_column(HALFVEC(HISTORY_EMBEDDING_DIMENSIONS), nullable=False)
     # 'metadata' is reserved in SQLAlchemy Declarative; map column name explicitly
     meta: Mapped[Optional[dict]] = mapped_column("metadata", JSONB, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), default=utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     project: Mapped[Optional[Project]] = relationship("Project")
 
@@ -230,13 +309,13 @@ class GoogleAuth(Base):
     )
     access_token: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     refresh_token: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    token_expiry: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=False), nullable=True)
+    token_expiry: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     scope: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     # Temporary OAuth 'state' parameter and timestamp for CSRF protection
     state: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
-    state_created_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=False), nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), default=utcnow, nullable=False)
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=False), default=utcnow, onupdate=utcnow, nullable=False)
+    state_created_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), server_onupdate=FetchedValue(), nullable=False)
 
     user: Mapped[User] = relationship("User")
 
@@ -3,14 +3,21 @@
 from __future__ import annotations
 
 from contextlib import contextmanager
-from typing import Iterator
+from functools import wraps
+from typing import Callable, Iterator, TypeVar
+import logging
 import os
+import time
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.engine.default import CACHE_HIT
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import NullPool
 from sqlalchemy.orm import DeclarativeBase, sessionmaker, Session
 
-from server.core.config import DATABASE_DSN
+from server.core.config import DATABASE_DSN, _env_flag
 
+logger = logging.getLogger(__name__)
 
 if not DATABASE_DSN:
     raise RuntimeError("DATABASE_DSN must be set to initialise the database layer")
@@ -29,29 +36,144 @@ class Base(DeclarativeBase):
 _POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "2"))
 _MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "1"))
 _POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a connection
-_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "300"))  # seconds before recycling a connection
+# Recycle before the pooler's idle timeout closes the server side, so the
+# checkout pre-ping rarely finds a dead connection to replace.
+_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "240"))  # seconds before recycling a connection
+# Compiled-SQL cache entries per engine; sized above the default 500 so every
+# ORM query shape in the app stays resident.
+_QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", "1200"))
+_LOG_CACHE_STATS = _env_flag("DB_LOG_CACHE_STATS")
+_CACHE_STATS_INTERVAL = 60.0
+
+# Supabase's transaction-mode pooler (PgBouncer) listens on 6543. Behind it the
+# pooler owns the connections, so a client-side pool only adds checkout waits,
+# and server-side prepared statements break because consecutive transactions
+# can land on different backends.
+_SUPABASE_TRANSACTION_POOLER_PORT = 6543
+_DSN_URL = make_url(DATABASE_DSN)
+_TRANSACTION_POOLER = (
+    _env_flag("DB_TRANSACTION_POOLER")
+    or _DSN_URL.port == _SUPABASE_TRANSACTION_POOLER_PORT
+)
+
+if _TRANSACTION_POOLER:
+    # PgBouncer rejects the `options` startup parameter, so the pooled
+    # backends' own TimeZone (UTC on Supabase) applies.
+    _engine_options = {"poolclass": NullPool}
+    if _DSN_URL.get_driver_name() == "psycopg":
+        _engine_options["connect_args"] = {"prepare_threshold": None}
+else:
+    _engine_options = {
+        # Request handlers have no disconnect retry (retry_on_disconnect only
+        # wraps the job runner's status writes), so stale connections are
+        # caught at checkout. LIFO keeps the warm backends in use.
+        "pool_pre_ping": True,
+        "pool_use_lifo": True,
+        "pool_size": _POOL_SIZE,
+        "max_overflow": _MAX_OVERFLOW,
+        "pool_timeout": _POOL_TIMEOUT,
+        "pool_recycle": _POOL_RECYCLE,
+        # timestamptz values come back as UTC-aware datetimes; JIT compilation
+        # costs more than it saves on the app's short OLTP queries
+        "connect_args": {"options": "-c TimeZone=UTC -c jit=off"},
+    }
 
 engine = create_engine(
     DATABASE_DSN,
-    pool_pre_ping=True,
-    pool_size=_POOL_SIZE,
-    max_overflow=_MAX_OVERFLOW,
-    pool_timeout=_POOL_TIMEOUT,
-    pool_recycle=_POOL_RECYCLE,
+    query_cache_size=_QUERY_CACHE_SIZE,
+    **_engine_options,
 )
 
+
+if _LOG_CACHE_STATS:
+    _cache_stats = {"hits": 0, "total": 0, "since": time.monotonic()}
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _track_compiled_cache(conn, cursor, statement, parameters, context, executemany):
+        if context is None:
+            return
+        _cache_stats["total"] += 1
+        if context.cache_hit is CACHE_HIT:
+            _cache_stats["hits"] += 1
+        now = time.monotonic()
+        if now - _cache_stats["since"] >= _CACHE_STATS_INTERVAL:
+            logger.info(
+                "SQL compiled cache hit rate: %d/%d (%.0f%%)",
+                _cache_stats["hits"],
+                _cache_stats["total"],
+                100.0 * _cache_stats["hits"] / _cache_stats["total"],
+            )
+            _cache_stats.update(hits=0, total=0, since=now)
+
 SessionLocal = sessionmaker(bind=engine, class_=Session, expire_on_commit=False)
 
+_WROTE_KEY = "wrote"
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _mark_flush(session, flush_context):
+    session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _mark_statement(orm_execute_state):
+    # Anything that is not a SELECT (ORM DML, textual SQL) counts as a write
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info[_WROTE_KEY] = True
+
+
+@event.listens_for(SessionLocal, "after_transaction_end")
+def _clear_writes(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_WROTE_KEY, None)
+
+
+def has_pending_writes(session: Session) -> bool:
+    """True when the open transaction has written, or has unflushed changes."""
+    if not session.in_transaction():
+        return False
+    return bool(
+        session.info.get(_WROTE_KEY)
+        or session.new
+        or session.dirty
+        or session.deleted
+    )
+
 
 @contextmanager
 def get_session() -> Iterator[Session]:
+    # Read-only work ends in the ROLLBACK issued by close() rather than a COMMIT
     session = SessionLocal()
     try:
         yield session
-        session.commit()
+        if has_pending_writes(session):
+            session.commit()
     except Exception:
         session.rollback()
         raise
     finally:
         session.close()
 
+
+
+_F = TypeVar("_F", bound=Callable)
+
+
+def retry_on_disconnect(func: _F) -> _F:
+    """Retry once when the pooled connection turned out to be dead.
+
+    Only for functions that open their own session: the failed attempt's
+    transaction never reached the server, so running it again is safe.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except OperationalError as exc:
+            if not exc.connection_invalidated:
+                raise
+            logger.warning("Database connection was stale; retrying %s", func.__qualname__)
+            return func(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
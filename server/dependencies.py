@@ -3,12 +3,13 @@
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import Iterator
+from typing import AsyncIterator, Callable, Dict
 
-from fastapi import Depends
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from .adapters.auth import AuthProvider, LocalAuthProvider, SupabaseAuthProvider
+from .adapters.auth import AuthError, AuthProvider, LocalAuthProvider, SupabaseAuthProvider
 from .adapters.storage import LocalStorageBackend, StorageBackend, SupabaseStorageBackend
 from .core.config import (
     AUTH_PROVIDER,
@@ -20,12 +21,26 @@ from .core.config import (
     SUPABASE_SERVICE_ROLE_KEY,
     SUPABASE_URL,
 )
-from .db.session import get_session
+from .db.session import SessionLocal, has_pending_writes
 
 
-def db_session() -> Iterator[Session]:
-    with get_session() as session:
+async def db_session() -> AsyncIterator[Session]:
+    # Creating a Session does no I/O, so FastAPI awaits this directly rather
+    # than entering a sync generator on the threadpool. Only teardown that
+    # talks to the database is offloaded.
+    session = SessionLocal()
+    try:
         yield session
+        if has_pending_writes(session):
+            await run_in_threadpool(session.commit)
+    except Exception:
+        await run_in_threadpool(session.rollback)
+        raise
+    finally:
+        if session.in_transaction():
+            await run_in_threadpool(session.close)
+        else:
+            session.close()
 
 
 @lru_cache(maxsize=1)
@@ -62,3 +77,44 @@ def _auth_provider() -> AuthProvider:
 def get_auth_provider() -> AuthProvider:
     return _auth_provider()
 
+
+async def _caller_key(request: Request, db: Session) -> str:
+    # Keyed on the resolved account, so one user's sessions share a budget and
+    # no credential is kept as a dict key; anonymous callers fall back to host
+    try:
+        user = await run_in_threadpool(get_auth_provider().current_user, request, db)
+    except AuthError:
+        user = None
+    if user is not None:
+        return f"user:{user.id}"
+    return f"host:{request.client.host if request.client else ''}"
+
+
+def concurrency_limit(max_concurrent: int) -> Callable[..., AsyncIterator[None]]:
+    """Dependency rejecting a user's requests beyond `max_concurrent` in flight.
+
+    The counter lives in this worker process only, so with several uvicorn
+    workers a user may have up to `max_concurrent` requests in each. Counts
+    are held only while the request runs.
+    """
+    in_flight: Dict[str, int] = {}
+
+    async def _limit(request: Request, db: Session = Depends(db_session)) -> AsyncIterator[None]:
+        key = await _caller_key(request, db)
+        current = in_flight.get(key, 0)
+        if current >= max_concurrent:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many concurrent requests; retry once earlier ones finish",
+            )
+        in_flight[key] = current + 1
+        try:
+            yield
+        finally:
+            remaining = in_flight[key] - 1
+            if remaining:
+                in_flight[key] = remaining
+            else:
+                del in_flight[key]
+
+    return _limit
@@ -0,0 +1,18 @@
+"""Storage key helpers shared by the file and artifact routes."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=512)
+def _project_prefix(project_id: str) -> str:
+    return f"projects/{project_id}/"
+
+
+def storage_key(project_id: str, relative_path: str) -> str:
+    # Only slice when there is something to strip; lstrip always copies
+    clean = relative_path[1:] if relative_path[:1] == "/" else relative_path
+    if clean[:1] == "/":
+        clean = clean.lstrip("/")
+    return _project_prefix(project_id) + clean
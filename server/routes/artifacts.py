@@ -2,22 +2,24 @@
 
 from __future__ import annotations
 
+import mimetypes
 from datetime import datetime
 from pathlib import Path
-from tempfile import NamedTemporaryFile
-from typing import List
+from typing import List, Optional
+from urllib.parse import quote
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.concurrency import run_in_threadpool
-from fastapi.responses import FileResponse, RedirectResponse
-from pydantic import BaseModel, ConfigDict
+from fastapi.responses import RedirectResponse, StreamingResponse
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+from sqlalchemy import lambda_stmt, select
 from sqlalchemy.orm import Session
-from starlette.background import BackgroundTask
 
 from server.core.config import ARTIFACT_URL_EXPIRY_SECONDS
 
 from ..adapters.storage import StorageBackend
+from ._storage_keys import storage_key as _storage_key
 from ..dependencies import db_session, get_storage
 from ..db import models
 
@@ -36,31 +38,20 @@ class ArtifactResponse(BaseModel):
     created_at: datetime
 
 
+# Validates a whole list in one call into pydantic-core instead of one per item
+_ARTIFACT_LIST_ADAPTER = TypeAdapter(List[ArtifactResponse])
+
+
 @router.get("/runs/{run_id}/artifacts", response_model=List[ArtifactResponse])
 async def list_artifacts_by_run(run_id: UUID, db: Session = Depends(db_session)) -> List[ArtifactResponse]:
-    artifacts = (
-        db.query(models.Artifact)
-        .filter(models.Artifact.run_id == run_id)
-        .order_by(models.Artifact.created_at.asc())
-        .all()
-    )
-    if not artifacts:
-        run = db.get(models.Run, run_id)
-        if not run:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
-    return [ArtifactResponse.model_validate(artifact) for artifact in artifacts]
+    artifacts = _run_artifacts(db, run_id)
+    return _ARTIFACT_LIST_ADAPTER.validate_python(artifacts, from_attributes=True)
 
 
 @router.get("/projects/{project_id}/runs/{run_id}/artifacts", response_model=List[ArtifactResponse])
 async def list_artifacts(project_id: UUID, run_id: UUID, db: Session = Depends(db_session)) -> List[ArtifactResponse]:
-    run = _get_run(db, project_id, run_id)
-    artifacts = (
-        db.query(models.Artifact)
-        .filter(models.Artifact.run_id == run.id)
-        .order_by(models.Artifact.created_at.asc())
-        .all()
-    )
-    return [ArtifactResponse.model_validate(artifact) for artifact in artifacts]
+    artifacts = _run_artifacts(db, run_id, project_id)
+    return _ARTIFACT_LIST_ADAPTER.validate_python(artifacts, from_attributes=True)
 
 
 @router.get("/artifacts/{artifact_id}/download")
@@ -83,39 +74,44 @@ async def download_artifact(
     if signed_url:
         return RedirectResponse(url=signed_url, status_code=status.HTTP_302_FOUND)
 
-    tmp_file = NamedTemporaryFile(delete=False)
-    tmp_path = Path(tmp_file.name)
-    tmp_file.close()
-
+    # Proxy the object chunk by chunk rather than staging it on local disk
     try:
-        await run_in_threadpool(storage.download_to_path, storage_key, tmp_path)
+        chunks = await run_in_threadpool(storage.open_stream, storage_key)
     except Exception as exc:  # pragma: no cover - backend failure
-        tmp_path.unlink(missing_ok=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Unable to fetch artifact: {exc}")
 
     filename = Path(artifact.path).name
-    return FileResponse(
-        str(tmp_path),
-        filename=filename,
-        background=BackgroundTask(_cleanup_temp_file, tmp_path),
+    return StreamingResponse(
+        chunks,
+        media_type=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+        headers={"Content-Disposition": _attachment_disposition(filename)},
     )
 
 
-def _get_run(db: Session, project_id: UUID, run_id: UUID) -> models.Run:
-    run = db.get(models.Run, run_id)
-    if not run or run.project_id != project_id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
-    return run
-
+def _run_artifacts(db: Session, run_id: UUID, project_id: Optional[UUID] = None) -> List[models.Artifact]:
+    """Artifacts of the run, oldest first; 404 if no run matches.
 
-def _storage_key(project_id: str, relative_path: str) -> str:
-    clean = relative_path.lstrip("/")
-    return f"projects/{project_id}/{clean}"
+    The outer join answers both questions in one round trip: a run without
+    artifacts still yields a single row whose artifact is None.
+    """
+    stmt = lambda_stmt(
+        lambda: select(models.Run.id, models.Artifact)
+        .outerjoin(models.Artifact, models.Artifact.run_id == models.Run.id)
+        .where(models.Run.id == run_id)
+    )
+    if project_id is not None:
+        stmt += lambda s: s.where(models.Run.project_id == project_id)
+    stmt += lambda s: s.order_by(models.Artifact.created_at.asc())
+    rows = db.execute(stmt).all()
+    if not rows:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Run not found")
+    return [artifact for _run_id, artifact in rows if artifact is not None]
 
 
-def _cleanup_temp_file(path: Path) -> None:  # pragma: no cover - background cleanup
-    try:
-        path.unlink()
-    except FileNotFoundError:
-        pass
+def _attachment_disposition(filename: str) -> str:
+    # Same encoding FileResponse applies to non-ASCII filenames
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
 
@@ -6,6 +6,7 @@ from typing import Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy.orm import Session
 
@@ -61,12 +62,14 @@ async def register_admin(payload: RegisterRequest, db: Session = Depends(db_sess
 
     from ..db import models  # local import to avoid circular dependency when unavailable
 
-    existing = db.query(models.User).count()
-    if existing > 0:
+    # Stops at the first row instead of counting the whole table
+    has_users = db.query(models.User.id).limit(1).first() is not None
+    if has_users:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Registration disabled after initial setup")
 
     try:
-        user = provider.register(_normalise_email(payload.email), payload.password, db)
+        # Argon2 hashing is deliberately CPU-heavy; keep it off the event loop
+        user = await run_in_threadpool(provider.register, _normalise_email(payload.email), payload.password, db)
     except AuthUnsupportedError:
         raise HTTPException(status_code=status.HTTP_405_METHOD_NOT_ALLOWED, detail="Registration managed externally")
     except AuthError as exc:
@@ -79,7 +82,7 @@ async def register_admin(payload: RegisterRequest, db: Session = Depends(db_sess
 async def login(payload: LoginRequest, response: Response, db: Session = Depends(db_session)) -> SessionUser:
     provider = get_auth_provider()
     try:
-        user = provider.authenticate(_normalise_email(payload.email), payload.password, db)
+        user = await run_in_threadpool(provider.authenticate, _normalise_email(payload.email), payload.password, db)
         provider.attach_to_response(response, user)
     except AuthUnsupportedError:
         raise HTTPException(status_code=status.HTTP_405_METHOD_NOT_ALLOWED, detail="Login managed externally")
@@ -142,8 +145,8 @@ async def change_password(
     
     password_service = PasswordService()
     
-    # Verify current password
-    if not password_service.verify(user.password_hash, payload.current_password):
+    # Verify current password (Argon2 is CPU-heavy; run it off the event loop)
+    if not await run_in_threadpool(password_service.verify, user.password_hash, payload.current_password):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Current password is incorrect")
     
     # Validate new password
@@ -151,7 +154,7 @@ async def change_password(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Password must be at least 8 characters")
     
     # Update password
-    user.password_hash = password_service.hash(payload.new_password)
+    user.password_hash = await run_in_threadpool(password_service.hash, payload.new_password)
     db.commit()
     
     return {"message": "Password changed successfully"}
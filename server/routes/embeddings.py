@@ -2,20 +2,27 @@
 
 from __future__ import annotations
 
+import asyncio
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, Request, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
 from server.core.config import get_project_data_dir
 from server.core.history_profiles import ProfileEmbedder
 from server.core.config import HISTORY_EMBEDDING_MODEL
+from server.dependencies import concurrency_limit
 
 
 router = APIRouter(prefix="/projects/{project_id}/embeddings", tags=["embeddings"])
 
+# Embedding requests in flight per caller, shared by both embed endpoints
+_embed_limit = concurrency_limit(3)
+
 
 class EmbedScopeRequest(BaseModel):
     relative_path: Optional[str] = None
@@ -51,30 +58,33 @@ def _load_content(path: Path) -> str:
         return f.read()
 
 
+def _read_document(project_id: str, relative_path: str) -> str:
+    return _load_content(_resolve_document(project_id, relative_path))
+
+
+@lru_cache(maxsize=1)
 def _get_embedder() -> ProfileEmbedder:
     return ProfileEmbedder(HISTORY_EMBEDDING_MODEL)
 
 
-@router.post("/", response_model=EmbedScopeResponse)
-async def embed_scope_document(
-    project_id: str,
-    payload: EmbedScopeRequest,
-    request: Request,
-) -> EmbedScopeResponse:
+def _vector_store(request: Request):
+    store = getattr(request.app.state, "vector_store", None)
+    if store is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Vector store not configured")
+    return store
+
+
+async def _payload_content(project_id: str, payload: EmbedScopeRequest) -> str:
     try:
         payload.validate()
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
 
-    store = getattr(request.app.state, "vector_store", None)
-    if store is None:
-        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Vector store not configured")
-
     content = payload.content
     if content is None and payload.relative_path:
         try:
-            doc_path = _resolve_document(project_id, payload.relative_path)
-            content = _load_content(doc_path)
+            # Stat and read on the threadpool so slow disks don't stall the event loop
+            content = await run_in_threadpool(_read_document, project_id, payload.relative_path)
         except FileNotFoundError as exc:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
         except Exception as exc:
@@ -82,13 +92,10 @@ async def embed_scope_document(
 
     if not content:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No content available to embed")
+    return content
 
-    try:
-        embedder = _get_embedder()
-        embedding_vector = embedder.embed(content)
-    except Exception as exc:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to generate embedding: {exc}")
 
+def _store_embedding(store, project_id: str, payload: EmbedScopeRequest, embedding_vector) -> EmbedScopeResponse:
     try:
         embedding_id = store.upsert_embedding(
             embedding=embedding_vector,
@@ -102,3 +109,51 @@ async def embed_scope_document(
 
     return EmbedScopeResponse(embedding_id=embedding_id, doc_kind=payload.doc_kind)
 
+
+def _store_embeddings(
+    store, project_id: str, payloads: List[EmbedScopeRequest], embedding_vectors
+) -> List[EmbedScopeResponse]:
+    return [
+        _store_embedding(store, project_id, payload, embedding_vector)
+        for payload, embedding_vector in zip(payloads, embedding_vectors)
+    ]
+
+
+@router.post("/", response_model=EmbedScopeResponse, dependencies=[Depends(_embed_limit)])
+async def embed_scope_document(
+    project_id: str,
+    payload: EmbedScopeRequest,
+    request: Request,
+) -> EmbedScopeResponse:
+    store = _vector_store(request)
+    content = await _payload_content(project_id, payload)
+
+    try:
+        embedder = _get_embedder()
+        # The embeddings call and the upsert both block, so neither runs on the loop
+        embedding_vector = await run_in_threadpool(embedder.embed, content)
+    except Exception as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to generate embedding: {exc}")
+
+    return await run_in_threadpool(_store_embedding, store, project_id, payload, embedding_vector)
+
+
+@router.post("/batch", response_model=List[EmbedScopeResponse], dependencies=[Depends(_embed_limit)])
+async def embed_scope_documents(
+    project_id: str,
+    payloads: List[EmbedScopeRequest],
+    request: Request,
+) -> List[EmbedScopeResponse]:
+    """Embed several documents with a single embeddings API request."""
+    store = _vector_store(request)
+    contents = await asyncio.gather(*(_payload_content(project_id, payload) for payload in payloads))
+    if not contents:
+        return []
+
+    try:
+        embedder = _get_embedder()
+        embedding_vectors = await run_in_threadpool(embedder.embed_many, list(contents))
+    except Exception as exc:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to generate embeddings: {exc}")
+
+    return await run_in_threadpool(_store_embeddings, store, project_id, payloads, embedding_vectors)
@@ -2,30 +2,34 @@
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
-import json
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import BinaryIO, Dict, List, Optional, Tuple
 import io
 import logging
 import mimetypes
 from uuid import UUID
-from tempfile import NamedTemporaryFile, TemporaryDirectory
+from tempfile import TemporaryDirectory
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+from sqlalchemy import lambda_stmt, select
 from sqlalchemy.orm import Session
 
 from PyPDF2 import PdfReader
 
 from ..adapters.storage import StorageBackend
+from ..core.config import MAX_UPLOAD_BYTES, UPLOAD_CONCURRENCY
 from ..core.ingest import DocumentIngester, MAX_NATIVE_PDF_BYTES, MAX_NATIVE_PDF_PAGES
 from ..core.llm import ClaudeExtractor
-from ..core.summarizer import FileSummarizer
-from ..dependencies import db_session, get_storage
+from ..core.summarizer import FileSummarizer, json_dumps, json_loads
+from ._storage_keys import storage_key as _storage_key
+from ..dependencies import concurrency_limit, db_session, get_storage
 from ..db import models
 from ..services.token_counter import (
     TokenCountingError,
@@ -41,16 +45,16 @@ router = APIRouter(prefix="/projects/{project_id}/files", tags=["files"])
 LOGGER = logging.getLogger(__name__)
 
 # As of Nov 2025, from https://support.anthropic.com/en/articles/8241126-what-kinds-of-documents-can-i-upload-to-claude-ai
-_SUPPORTED_DOC_EXTENSIONS = {
+_SUPPORTED_DOC_EXTENSIONS = frozenset({
     ".pdf",
     ".docx",
     ".odt",
     ".rtf",
     ".epub",
     ".xlsx",
-}
+})
 # These formats are treated as plain text for ingestion
-_TEXT_LIKE_EXTENSIONS = {
+_TEXT_LIKE_EXTENSIONS = frozenset({
     ".csv",
     ".txt",
     ".html",
@@ -61,19 +65,56 @@ _TEXT_LIKE_EXTENSIONS = {
     ".vtt",
     ".yaml",
     ".yml",
-}
-_SUPPORTED_IMG_EXTENSIONS = {
+})
+_SUPPORTED_IMG_EXTENSIONS = frozenset({
     ".jpeg",
     ".jpg",
     ".png",
     ".gif",
     ".webp",
-}
+})
 SUPPORTED_EXTENSIONS = _SUPPORTED_DOC_EXTENSIONS | _TEXT_LIKE_EXTENSIONS | _SUPPORTED_IMG_EXTENSIONS
+# Token-block kind per supported extension, resolved with one lookup
+_SUFFIX_KINDS = {
+    **{ext: "document" for ext in _SUPPORTED_DOC_EXTENSIONS},
+    **{ext: "text" for ext in _TEXT_LIKE_EXTENSIONS},
+    **{ext: "image" for ext in _SUPPORTED_IMG_EXTENSIONS},
+}
+# Non text/* media types whose content is still counted as text
+_TEXT_MEDIA_TYPES = frozenset({"application/json", "application/xml"})
+# Media types for every supported extension, so uploads don't depend on the
+# host's mime database; mimetypes remains the fallback for anything else
+_EXTENSION_MEDIA_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".odt": "application/vnd.oasis.opendocument.text",
+    ".rtf": "application/rtf",
+    ".epub": "application/epub+zip",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".csv": "text/csv",
+    ".txt": "text/plain",
+    ".html": "text/html",
+    ".json": "application/json",
+    ".md": "text/markdown",
+    ".vtt": "text/vtt",
+    ".yaml": "application/yaml",
+    ".yml": "application/yaml",
+    ".jpeg": "image/jpeg",
+    ".jpg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
 
 
 _DOCUMENT_INGESTER = DocumentIngester()
-_FILE_SUMMARIZER: Optional[FileSummarizer] = None
+# upload_files requests in flight per caller; each holds a DB connection and storage PUTs
+_upload_limit = concurrency_limit(3)
+_SPOOL_CHUNK_SIZE = 1024 * 1024
+# Upper end of the per-page text cost Anthropic documents for PDF input
+_ESTIMATED_TOKENS_PER_PDF_PAGE = 3000
+# Images are downscaled before tokenisation, which caps their cost near this
+_ESTIMATED_TOKENS_PER_IMAGE = 1600
 
 
 class ProjectFileResponse(BaseModel):
@@ -93,79 +134,159 @@ class ProjectFileResponse(BaseModel):
     pdf_page_count: Optional[int] = None
     use_summary_for_generation: bool
     native_token_count: int
+    native_token_count_estimated: bool = False
     summary_token_count: int
 
 
-async def _analyze_uploaded_file(
-    *,
-    filename: str,
-    media_type: Optional[str],
-    contents: bytes,
-) -> Dict[str, object]:
+# Validates a whole list in one call into pydantic-core instead of one per item
+_FILE_LIST_ADAPTER = TypeAdapter(List[ProjectFileResponse])
+# Columns backing ProjectFileResponse, so listings skip loading ORM instances
+_FILE_RESPONSE_COLUMNS = tuple(getattr(models.ProjectFile, name) for name in ProjectFileResponse.model_fields)
+
+
+def _normalize_upload_media_type(filename: str, suffix: str, media_type: Optional[str]) -> str:
     normalized_media_type = media_type or ""
     if normalized_media_type.lower() in {"application/octet-stream", "binary/octet-stream"}:
         normalized_media_type = ""
 
-    normalized_media_type = (
+    return (
         normalized_media_type
+        or _EXTENSION_MEDIA_TYPES.get(suffix)
         or mimetypes.guess_type(filename)[0]
         or "application/octet-stream"
     )
-    suffix = Path(filename).suffix.lower()
 
-    pdf_page_count = None
+
+def _cached_analysis(
+    db: Session, project_id: UUID, checksum: str, media_type: str
+) -> Optional[Dict[str, object]]:
+    """Analysis of an earlier upload of the same bytes to this project, shaped like a fresh one.
+
+    Only the uploading project's files are considered, so summaries never
+    cross project or team boundaries. Rows whose counting or summarization
+    failed are not reused. Per-file choices made after upload (toggled mode,
+    on-demand summaries of files that fit natively) are reset to upload
+    defaults.
+    """
+    previous = db.execute(
+        select(
+            models.ProjectFile.is_too_large,
+            models.ProjectFile.pdf_page_count,
+            models.ProjectFile.native_token_count,
+            models.ProjectFile.native_token_count_estimated,
+            models.ProjectFile.summary_text,
+            models.ProjectFile.summary_token_count,
+        )
+        .where(
+            models.ProjectFile.project_id == project_id,
+            models.ProjectFile.checksum == checksum,
+            models.ProjectFile.media_type == media_type,
+        )
+        .order_by(models.ProjectFile.created_at.desc())
+        .limit(1)
+    ).first()
+    if previous is None:
+        return None
+
+    if previous.is_too_large:
+        if not previous.summary_text:
+            return None
+        return {
+            "media_type": media_type,
+            "token_count": previous.summary_token_count,
+            "native_token_count": previous.native_token_count,
+            "native_token_count_estimated": previous.native_token_count_estimated,
+            "summary_token_count": previous.summary_token_count,
+            "is_summarized": True,
+            "summary_text": previous.summary_text,
+            "is_too_large": True,
+            "pdf_page_count": previous.pdf_page_count,
+            "use_summary_for_generation": True,
+        }
+
+    if not previous.native_token_count:
+        return None
+    return {
+        "media_type": media_type,
+        "token_count": previous.native_token_count,
+        "native_token_count": previous.native_token_count,
+        "native_token_count_estimated": False,
+        "summary_token_count": 0,
+        "is_summarized": False,
+        "summary_text": None,
+        "is_too_large": False,
+        "pdf_page_count": previous.pdf_page_count,
+        "use_summary_for_generation": False,
+    }
+
+
+def _retarget_summary(summary_text: Optional[str], filename: str) -> Optional[str]:
+    """Point a reused summary at the file it is attached to."""
+    if not summary_text:
+        return summary_text
+    try:
+        summary = json_loads(summary_text)
+    except ValueError:
+        return summary_text
+    if not isinstance(summary, dict) or summary.get("filename") == filename:
+        return summary_text
+    summary["filename"] = filename
+    return json_dumps(summary).decode("utf-8")
+
+
+async def _analyze_uploaded_file(
+    *,
+    filename: str,
+    media_type: Optional[str],
+    suffix: str,
+    path: Path,
+    size: int,
+) -> Dict[str, object]:
+    normalized_media_type = _normalize_upload_media_type(filename, suffix, media_type)
+
     is_pdf = normalized_media_type == "application/pdf" or suffix == ".pdf"
+    pdf_page_count = None
     if is_pdf:
-        pdf_page_count = _extract_pdf_page_count(contents)
+        pdf_page_count = await run_in_threadpool(_extract_pdf_page_count, path)
 
-    size = len(contents)
     is_too_large = size > MAX_NATIVE_PDF_BYTES or (is_pdf and pdf_page_count and pdf_page_count > MAX_NATIVE_PDF_PAGES)
 
     token_count = 0
     native_token_count = 0
+    native_token_count_estimated = False
     summary_token_count = 0
     is_summarized = False
     summary_text: Optional[str] = None
     use_summary_for_generation = is_too_large  # Default: use summary only if too large
 
-    # Always calculate native token count first, if possible
-    if not is_too_large:
-        blocks = _build_token_blocks(
-            filename=filename,
-            media_type=normalized_media_type,
-            contents=contents,
-            suffix=suffix,
-        )
-        if blocks:
-            try:
-                native_token_count = await count_tokens_for_blocks(blocks)
-                token_count = native_token_count  # Initially, token_count = native count
-            except TokenCountingError as exc:
-                LOGGER.warning("Token counting failed for %s: %s", filename, exc)
-                native_token_count = 0
-                token_count = 0
-        else:
-            LOGGER.info("No countable content for %s; defaulting token count to 0", filename)
-
-    # For large files, we still want to know the native token count for context
+    # The counting API rejects documents over the byte or page limit, so
+    # oversized files are never read and encoded for it; they record a
+    # flagged estimate instead.
     if is_too_large:
-        blocks = _build_token_blocks(
+        native_token_count = _estimate_native_tokens(
+            kind=_block_kind(normalized_media_type, suffix),
+            size=size,
+            pdf_page_count=pdf_page_count,
+        )
+        native_token_count_estimated = True
+        LOGGER.info("Estimated native token count for oversized file %s (%d bytes)", filename, size)
+    else:
+        counted = await _count_native_tokens(
             filename=filename,
             media_type=normalized_media_type,
-            contents=contents,
+            path=path,
             suffix=suffix,
         )
-        if blocks:
-            try:
-                native_token_count = await count_tokens_for_blocks(blocks)
-            except TokenCountingError as exc:
-                LOGGER.warning("Token counting (native) failed for %s: %s", filename, exc)
-                native_token_count = 0
+        if counted is None:
+            LOGGER.info("No countable content for %s; defaulting token count to 0", filename)
+        else:
+            native_token_count = counted
+            token_count = native_token_count  # Initially, token_count = native count
 
     # If the file is too large, it MUST be summarized.
     # The summary token count becomes the main token_count.
     if is_too_large:
-        summary_text = await _summarize_file_contents(filename, contents)
+        summary_text = await _summarize_file(filename, path)
         if summary_text:
             is_summarized = True
             try:
@@ -184,6 +305,7 @@ async def _analyze_uploaded_file(
         "media_type": normalized_media_type,
         "token_count": token_count,
         "native_token_count": native_token_count,
+        "native_token_count_estimated": native_token_count_estimated,
         "summary_token_count": summary_token_count,
         "is_summarized": is_summarized,
         "summary_text": summary_text,
@@ -193,6 +315,40 @@ async def _analyze_uploaded_file(
     }
 
 
+def _estimate_native_tokens(*, kind: str, size: int, pdf_page_count: Optional[int]) -> int:
+    """Rough native cost of a file too large to count; PDFs by page, text by bytes."""
+    if pdf_page_count:
+        return pdf_page_count * _ESTIMATED_TOKENS_PER_PDF_PAGE
+    if kind == "image":
+        return _ESTIMATED_TOKENS_PER_IMAGE
+    # About four bytes of text per token
+    return max(1, size // 4)
+
+
+async def _count_native_tokens(
+    *,
+    filename: str,
+    media_type: str,
+    path: Path,
+    suffix: str,
+) -> Optional[int]:
+    """Count the file sent as-is; None when it has no countable content."""
+    contents = await run_in_threadpool(path.read_bytes)
+    blocks = _build_token_blocks(
+        filename=filename,
+        media_type=media_type,
+        contents=contents,
+        suffix=suffix,
+    )
+    if not blocks:
+        return None
+    try:
+        return await count_tokens_for_blocks(blocks)
+    except TokenCountingError as exc:
+        LOGGER.warning("Token counting failed for %s: %s", filename, exc)
+        return 0
+
+
 def _build_token_blocks(
     *,
     filename: str,
@@ -200,35 +356,32 @@ def _build_token_blocks(
     contents: bytes,
     suffix: str,
 ) -> List[Dict[str, object]]:
-    if _treat_as_text(media_type, suffix):
+    kind = _block_kind(media_type, suffix)
+    if kind == "text":
         text = _decode_text(contents)
         if not text.strip():
             return []
         return [make_text_block(text)]
 
-    if _treat_as_image(media_type, suffix):
+    if kind == "image":
         return [make_image_block(data=contents, media_type=media_type)]
 
     normalized_media_type = _normalize_document_media_type(media_type, suffix)
     return [make_document_block(data=contents, media_type=normalized_media_type, filename=filename)]
 
 
-def _treat_as_text(media_type: str, suffix: str) -> bool:
-    if media_type.startswith("text/"):
-        return True
-    if suffix in _TEXT_LIKE_EXTENSIONS:
-        return True
-    if media_type in {"application/json", "application/xml"}:
-        return True
-    return False
-
+def _block_kind(media_type: str, suffix: str) -> str:
+    """Classify an upload as "text", "image" or "document" for token counting.
 
-def _treat_as_image(media_type: str, suffix: str) -> bool:
-    if media_type.startswith("image/"):
-        return True
-    if suffix in _SUPPORTED_IMG_EXTENSIONS:
-        return True
-    return False
+    A text suffix or media type takes precedence over an image one; anything
+    else is sent as a document.
+    """
+    suffix_kind = _SUFFIX_KINDS.get(suffix)
+    if suffix_kind == "text" or media_type.startswith("text/") or media_type in _TEXT_MEDIA_TYPES:
+        return "text"
+    if suffix_kind == "image" or media_type.startswith("image/"):
+        return "image"
+    return "document"
 
 
 def _normalize_document_media_type(media_type: str, suffix: str) -> str:
@@ -244,24 +397,28 @@ def _decode_text(contents: bytes) -> str:
         return contents.decode("latin-1", errors="ignore")
 
 
-def _extract_pdf_page_count(contents: bytes) -> Optional[int]:
+def _extract_pdf_page_count(path: Path) -> Optional[int]:
     try:
-        pdf_reader = PdfReader(io.BytesIO(contents))
-        return len(pdf_reader.pages)
+        pdf_reader = PdfReader(str(path))
+        # The page tree root records the total, so the tree itself does not
+        # need flattening; malformed files fall back to counting pages
+        try:
+            count = int(pdf_reader.trailer["/Root"]["/Pages"]["/Count"])
+        except (KeyError, TypeError, ValueError):
+            count = 0
+        return count if count > 0 else len(pdf_reader.pages)
     except Exception as exc:  # pragma: no cover - best effort metadata extraction
         LOGGER.warning("Unable to read PDF pages: %s", exc)
         return None
 
 
+@lru_cache(maxsize=1)
 def _get_file_summarizer() -> FileSummarizer:
-    global _FILE_SUMMARIZER
-    if _FILE_SUMMARIZER is None:
-        _FILE_SUMMARIZER = FileSummarizer(ClaudeExtractor())
-    return _FILE_SUMMARIZER
+    return FileSummarizer(ClaudeExtractor())
 
 
-async def _summarize_file_contents(filename: str, contents: bytes) -> Optional[str]:
-    text = _extract_text_for_summary(filename, contents)
+async def _summarize_file(filename: str, path: Path) -> Optional[str]:
+    text = _extract_text_for_summary(filename, path)
     if not text:
         return None
 
@@ -280,30 +437,19 @@ async def _summarize_file_contents(filename: str, contents: bytes) -> Optional[s
         return None
 
     try:
-        return json.dumps(summary.summary, indent=2)
+        # orjson when installed, same two-space layout as the summary cache files
+        return json_dumps(summary.summary).decode("utf-8")
     except (TypeError, ValueError):
         return str(summary.summary)
 
 
-def _extract_text_for_summary(filename: str, contents: bytes) -> Optional[str]:
-    suffix = Path(filename).suffix or ".tmp"
-    temp_path: Optional[Path] = None
+def _extract_text_for_summary(filename: str, path: Path) -> Optional[str]:
+    # `path` keeps the original suffix, which the ingester dispatches on
     try:
-        with NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
-            tmp.write(contents)
-            tmp.flush()
-            temp_path = Path(tmp.name)
-
-        document = _DOCUMENT_INGESTER.ingest_file(temp_path)
+        document = _DOCUMENT_INGESTER.ingest_file(path)
     except Exception as exc:  # pragma: no cover - best effort extraction
         LOGGER.warning("Unable to ingest %s for summary: %s", filename, exc)
         return None
-    finally:
-        if temp_path and temp_path.exists():
-            try:
-                temp_path.unlink()
-            except Exception:
-                pass
 
     texts: List[str] = []
     if isinstance(document, list):
@@ -323,16 +469,23 @@ def _extract_text_for_summary(filename: str, contents: bytes) -> Optional[str]:
 @router.get("/", response_model=List[ProjectFileResponse])
 async def list_files(project_id: UUID, db: Session = Depends(db_session)) -> List[ProjectFileResponse]:
     project = _get_project(db, project_id)
-    files = (
-        db.query(models.ProjectFile)
-        .filter(models.ProjectFile.project_id == project.id)
-        .order_by(models.ProjectFile.created_at.desc())
-        .all()
-    )
-    return [ProjectFileResponse.model_validate(file) for file in files]
+    project_uuid = project.id
+    rows = db.execute(
+        lambda_stmt(
+            lambda: select(*_FILE_RESPONSE_COLUMNS)
+            .where(models.ProjectFile.project_id == project_uuid)
+            .order_by(models.ProjectFile.created_at.desc())
+        )
+    ).all()
+    return _FILE_LIST_ADAPTER.validate_python(rows, from_attributes=True)
 
 
-@router.post("/", response_model=List[ProjectFileResponse], status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/",
+    response_model=List[ProjectFileResponse],
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(_upload_limit)],
+)
 async def upload_files(
     project_id: UUID,
     files: List[UploadFile] = File(...),
@@ -344,66 +497,54 @@ async def upload_files(
 
     project = _get_project(db, project_id)
 
-    records: List[models.ProjectFile] = []
-    storage_keys: List[str] = []
-
-    try:
-        for upload in files:
-            file_ext = Path(upload.filename).suffix.lower()
-            if file_ext not in SUPPORTED_EXTENSIONS:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Unsupported file type for '{upload.filename}'. Supported types: {', '.join(sorted(SUPPORTED_EXTENSIONS))}",
-                )
-
-            contents = await upload.read()
-            if not contents:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Uploaded file '{upload.filename}' is empty",
-                )
-
-            filename = Path(upload.filename).name
-            relative_path = f"input/{filename}"
-            storage_key = _storage_key(str(project.id), relative_path)
-
-            try:
-                await run_in_threadpool(storage.put_bytes, storage_key, contents, upload.content_type)
-            except Exception as exc:  # pragma: no cover - backend failure
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Failed to save file '{filename}': {exc}",
-                )
-
-            storage_keys.append(storage_key)
-
-            checksum = hashlib.sha256(contents).hexdigest()
-
-            metadata = await _analyze_uploaded_file(
-                filename=filename,
-                media_type=upload.content_type,
-                contents=contents,
+    # Each filename is parsed once here and handed to _store_upload
+    names: List[Tuple[str, str]] = []
+    for upload in files:
+        upload_path = Path(upload.filename)
+        file_ext = upload_path.suffix.lower()
+        names.append((upload_path.name, file_ext))
+        if file_ext not in SUPPORTED_EXTENSIONS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported file type for '{upload.filename}'. Supported types: {', '.join(sorted(SUPPORTED_EXTENSIONS))}",
+            )
+        # Starlette records the spooled size, so oversized and empty files are
+        # rejected before anything is written to storage.
+        if upload.size is not None and upload.size > MAX_UPLOAD_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File '{upload.filename}' exceeds the {MAX_UPLOAD_BYTES} byte upload limit",
+            )
+        if upload.size == 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Uploaded file '{upload.filename}' is empty",
             )
 
-            record = models.ProjectFile(
-                project_id=project.id,
-                filename=filename,
-                path=relative_path,
-                size=len(contents),
-                media_type=metadata["media_type"],
-                checksum=checksum,
-                token_count=metadata["token_count"],
-                native_token_count=metadata["native_token_count"],
-                summary_token_count=metadata["summary_token_count"],
-                is_summarized=metadata["is_summarized"],
-                summary_text=metadata.get("summary_text"),
-                is_too_large=metadata["is_too_large"],
-                pdf_page_count=metadata.get("pdf_page_count"),
-                use_summary_for_generation=metadata["use_summary_for_generation"],
+    storage_keys: List[str] = []
+    analyses: Dict[Tuple[str, str], "asyncio.Future[Dict[str, object]]"] = {}
+    # The uploads share one Session, which must not be used from two threads at once
+    db_lock = asyncio.Lock()
+    # Files are stored and analysed concurrently; the cap keeps storage PUTs
+    # and token-counting calls from exhausting the threadpool and API limits.
+    semaphore = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+
+    async def _store(upload: UploadFile, filename: str, suffix: str) -> models.ProjectFile:
+        async with semaphore:
+            return await _store_upload(
+                upload, filename, suffix, project.id, db, db_lock, storage, storage_keys, analyses
             )
-            db.add(record)
-            records.append(record)
 
+    try:
+        results = await asyncio.gather(
+            *(_store(upload, filename, suffix) for upload, (filename, suffix) in zip(files, names)),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        records: List[models.ProjectFile] = list(results)
+        db.add_all(records)
         db.commit()
     except HTTPException:
         db.rollback()
@@ -417,10 +558,9 @@ async def upload_files(
             detail=f"Failed to upload files: {exc}",
         ) from exc
 
-    for record in records:
-        db.refresh(record)
-
-    return [ProjectFileResponse.model_validate(record) for record in records]
+    # expire_on_commit is off and the INSERT's RETURNING clause already filled
+    # server defaults such as created_at, so no refresh round trip is needed.
+    return _FILE_LIST_ADAPTER.validate_python(records, from_attributes=True)
 
 
 @router.post("/{file_id}/summarize", response_model=ProjectFileResponse)
@@ -431,17 +571,7 @@ async def summarize_file(
     storage: StorageBackend = Depends(get_storage),
 ) -> ProjectFileResponse:
     project = _get_project(db, project_id)
-    record = (
-        db.query(models.ProjectFile)
-        .filter(
-            models.ProjectFile.project_id == project.id,
-            models.ProjectFile.id == file_id,
-        )
-        .one_or_none()
-    )
-
-    if record is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    record = _get_project_file(db, project.id, file_id)
 
     file_ext = Path(record.filename).suffix.lower()
     if file_ext in _SUPPORTED_IMG_EXTENSIONS:
@@ -456,46 +586,47 @@ async def summarize_file(
         destination = Path(tmpdir) / record.filename
         try:
             await run_in_threadpool(storage.download_to_path, storage_key, destination)
-            contents = destination.read_bytes()
         except Exception as exc:  # pragma: no cover - storage failure
             LOGGER.error("Unable to download file %s for summarization: %s", record.filename, exc)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to download file")
 
-    summary_text = await _summarize_file_contents(record.filename, contents)
-    if not summary_text:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unable to summarize file")
+        summary_text = await _summarize_file(record.filename, destination)
+        if not summary_text:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Unable to summarize file")
 
-    try:
-        summary_token_count = await count_tokens_for_blocks([make_text_block(summary_text)])
-    except TokenCountingError as exc:
-        LOGGER.warning("Token counting (summary) failed for %s: %s", record.filename, exc)
-        summary_token_count = max(1, len(summary_text) // 4)
-
-    # If native_token_count is not set, calculate it from the original content
-    if record.native_token_count == 0:
-        blocks = _build_token_blocks(
-            filename=record.filename,
-            media_type=record.media_type or "",
-            contents=contents,
-            suffix=Path(record.filename).suffix.lower(),
-        )
-        if blocks:
-            try:
-                native_tokens = await count_tokens_for_blocks(blocks)
-                record.native_token_count = native_tokens
-            except TokenCountingError as exc:
-                LOGGER.warning("Token counting (native) failed for %s: %s", record.filename, exc)
-                record.native_token_count = 0  # Fallback
-        else:
-            record.native_token_count = 0
+        try:
+            summary_token_count = await count_tokens_for_blocks([make_text_block(summary_text)])
+        except TokenCountingError as exc:
+            LOGGER.warning("Token counting (summary) failed for %s: %s", record.filename, exc)
+            summary_token_count = max(1, len(summary_text) // 4)
+
+        # If native_token_count is not set, calculate it from the original content
+        if record.native_token_count == 0 and not record.is_too_large:
+            contents = await run_in_threadpool(destination.read_bytes)
+            blocks = _build_token_blocks(
+                filename=record.filename,
+                media_type=record.media_type or "",
+                contents=contents,
+                suffix=Path(record.filename).suffix.lower(),
+            )
+            if blocks:
+                try:
+                    native_tokens = await count_tokens_for_blocks(blocks)
+                    record.native_token_count = native_tokens
+                except TokenCountingError as exc:
+                    LOGGER.warning("Token counting (native) failed for %s: %s", record.filename, exc)
+                    record.native_token_count = 0  # Fallback
+            else:
+                record.native_token_count = 0
 
     record.summary_text = summary_text
     record.is_summarized = True
     record.summary_token_count = summary_token_count
     record.token_count = summary_token_count
     record.use_summary_for_generation = True
+    # project_files has no server-maintained columns to reload after an
+    # UPDATE, and expire_on_commit is off, so no refresh round trip
     db.commit()
-    db.refresh(record)
 
     return ProjectFileResponse.model_validate(record)
 
@@ -512,17 +643,7 @@ async def toggle_file_mode(
     the token_count to reflect the selected mode.
     """
     project = _get_project(db, project_id)
-    record = (
-        db.query(models.ProjectFile)
-        .filter(
-            models.ProjectFile.project_id == project.id,
-            models.ProjectFile.id == file_id,
-        )
-        .one_or_none()
-    )
-
-    if record is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    record = _get_project_file(db, project.id, file_id)
 
     # Can't toggle if file is too large and has no summary
     if record.is_too_large and not record.is_summarized:
@@ -550,7 +671,6 @@ async def toggle_file_mode(
         record.token_count = record.native_token_count
 
     db.commit()
-    db.refresh(record)
 
     return ProjectFileResponse.model_validate(record)
 
@@ -564,13 +684,7 @@ async def download_file(
 ):
     """Download a file's content."""
     project = _get_project(db, project_id)
-    record = (
-        db.query(models.ProjectFile)
-        .filter(models.ProjectFile.project_id == project.id, models.ProjectFile.id == file_id)
-        .one_or_none()
-    )
-    if record is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    record = _get_project_file(db, project.id, file_id)
 
     storage_key = _storage_key(str(project.id), record.path)
 
@@ -607,13 +721,7 @@ async def delete_file(
     storage: StorageBackend = Depends(get_storage),
 ) -> None:
     project = _get_project(db, project_id)
-    record = (
-        db.query(models.ProjectFile)
-        .filter(models.ProjectFile.project_id == project.id, models.ProjectFile.id == file_id)
-        .one_or_none()
-    )
-    if record is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    record = _get_project_file(db, project.id, file_id)
 
     storage_key = _storage_key(str(project.id), record.path)
     try:
@@ -632,15 +740,163 @@ def _get_project(db: Session, project_id: UUID) -> models.Project:
     return project
 
 
-def _storage_key(project_id: str, relative_path: str) -> str:
-    clean = relative_path.lstrip("/")
-    return f"projects/{project_id}/{clean}"
+def _get_project_file(db: Session, project_id: UUID, file_id: UUID) -> models.ProjectFile:
+    # lambda_stmt caches the statement construction itself, not just its SQL
+    record = db.execute(
+        lambda_stmt(
+            lambda: select(models.ProjectFile).where(
+                models.ProjectFile.project_id == project_id,
+                models.ProjectFile.id == file_id,
+            )
+        )
+    ).scalar_one_or_none()
+    if record is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    return record
+
 
+def _spool_upload(source: BinaryIO, destination: Path) -> Tuple[int, str]:
+    """Copy an upload's body to `destination` in chunks.
+
+    Returns the byte count and SHA-256 hex digest, hashed as each chunk is
+    written so the body is only read once.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    readinto = getattr(source, "readinto", None)
+    with destination.open("wb") as spool:
+        if readinto is None:
+            # SpooledTemporaryFile only gained readinto in Python 3.11
+            while chunk := source.read(_SPOOL_CHUNK_SIZE):
+                digest.update(chunk)
+                spool.write(chunk)
+                size += len(chunk)
+            return size, digest.hexdigest()
+
+        # One buffer reused for every chunk; slices of the view are not copies
+        buffer = bytearray(_SPOOL_CHUNK_SIZE)
+        view = memoryview(buffer)
+        while count := readinto(buffer):
+            chunk = view[:count]
+            digest.update(chunk)
+            spool.write(chunk)
+            size += count
+    return size, digest.hexdigest()
+
+
+async def _store_upload(
+    upload: UploadFile,
+    filename: str,
+    suffix: str,
+    project_id: UUID,
+    db: Session,
+    db_lock: asyncio.Lock,
+    storage: StorageBackend,
+    storage_keys: List[str],
+    analyses: Dict[Tuple[str, str], "asyncio.Future[Dict[str, object]]"],
+) -> models.ProjectFile:
+    """Store one upload and build its record; appends the key once stored.
+
+    `analyses` is shared by the uploads of one request so identical files in
+    the same batch are analysed once.
+    """
+    relative_path = f"input/{filename}"
+    storage_key = _storage_key(str(project_id), relative_path)
+
+    # The upload is spooled to disk and hashed in the same pass; storage and
+    # analysis then read the file rather than each holding the whole body.
+    with TemporaryDirectory() as tmpdir:
+        spool_path = Path(tmpdir) / filename
+        size, checksum = await run_in_threadpool(_spool_upload, upload.file, spool_path)
+        if not size:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Uploaded file '{upload.filename}' is empty",
+            )
 
-async def _cleanup_uploaded_files(storage: StorageBackend, storage_keys: List[str]) -> None:
-    for key in storage_keys:
         try:
-            await run_in_threadpool(storage.delete, key)
-        except Exception:  # pragma: no cover - best effort cleanup
-            pass
+            await run_in_threadpool(storage.upload_file, storage_key, spool_path, upload.content_type)
+        except Exception as exc:  # pragma: no cover - backend failure
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to save file '{filename}': {exc}",
+            )
+
+        storage_keys.append(storage_key)
+
+        # Re-uploads of the same bytes to this project skip the PDF parse,
+        # token counting and summarization. The future is registered before
+        # its first await, so duplicates in this batch wait on it; it is
+        # awaited here, before the spool directory goes away.
+        media_type = _normalize_upload_media_type(filename, suffix, upload.content_type)
+        pending = analyses.get((checksum, media_type))
+        if pending is None:
+            pending = asyncio.ensure_future(
+                _reuse_or_analyze(
+                    db,
+                    db_lock,
+                    project_id=project_id,
+                    checksum=checksum,
+                    filename=filename,
+                    media_type=media_type,
+                    suffix=suffix,
+                    path=spool_path,
+                    size=size,
+                )
+            )
+            analyses[(checksum, media_type)] = pending
+        metadata = await pending
+
+    return models.ProjectFile(
+        project_id=project_id,
+        filename=filename,
+        path=relative_path,
+        size=size,
+        media_type=metadata["media_type"],
+        checksum=checksum,
+        token_count=metadata["token_count"],
+        native_token_count=metadata["native_token_count"],
+        native_token_count_estimated=metadata["native_token_count_estimated"],
+        summary_token_count=metadata["summary_token_count"],
+        is_summarized=metadata["is_summarized"],
+        summary_text=_retarget_summary(metadata.get("summary_text"), filename),
+        is_too_large=metadata["is_too_large"],
+        pdf_page_count=metadata.get("pdf_page_count"),
+        use_summary_for_generation=metadata["use_summary_for_generation"],
+    )
+
+
+async def _reuse_or_analyze(
+    db: Session,
+    db_lock: asyncio.Lock,
+    *,
+    project_id: UUID,
+    checksum: str,
+    filename: str,
+    media_type: str,
+    suffix: str,
+    path: Path,
+    size: int,
+) -> Dict[str, object]:
+    async with db_lock:
+        cached = await run_in_threadpool(_cached_analysis, db, project_id, checksum, media_type)
+    if cached is not None:
+        return cached
+    return await _analyze_uploaded_file(
+        filename=filename,
+        media_type=media_type,
+        suffix=suffix,
+        path=path,
+        size=size,
+    )
+
+
+async def _cleanup_uploaded_files(storage: StorageBackend, storage_keys: List[str]) -> None:
+    if not storage_keys:
+        return
+    try:
+        # One bulk request on Supabase instead of a round trip per object
+        await run_in_threadpool(storage.delete_many, storage_keys)
+    except Exception:  # pragma: no cover - best effort cleanup
+        pass
 
@@ -143,7 +143,6 @@ async def update_project(
     if payload.flags is not None:
         project.flags = payload.flags
 
-    project.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(project)
     return ProjectResponse.model_validate(project)
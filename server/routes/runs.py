@@ -15,7 +15,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, ConfigDict
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, undefer_group
 
 from server.core.research import ResearchMode
 from server.core.config import (
@@ -120,13 +120,13 @@ def _storage_key(project_id: str, relative_path: str) -> str:
 def _create_step(db: Session, run_id: UUID, name: str, status_str: str = "running") -> models.RunStep:
     """Create a new step record for the given run."""
     from uuid import uuid4
-    from datetime import datetime as dt
+    from datetime import datetime as dt, timezone
     step = models.RunStep(
         id=uuid4(),
         run_id=run_id,
         name=name,
         status=status_str,
-        started_at=dt.utcnow(),
+        started_at=dt.now(timezone.utc),
     )
     db.add(step)
     db.commit()
@@ -136,9 +136,9 @@ def _create_step(db: Session, run_id: UUID, name: str, status_str: str = "runnin
 
 def _finish_step(db: Session, step: models.RunStep, status_str: str = "success", logs: str = None):
     """Mark a step as finished."""
-    from datetime import datetime as dt
+    from datetime import datetime as dt, timezone
     step.status = status_str
-    step.finished_at = dt.utcnow()
+    step.finished_at = dt.now(timezone.utc)
     if logs:
         step.logs = logs
     db.add(step)
@@ -206,20 +206,51 @@ def _extract_document_title(artifact_path: Optional[str], project_id: str) -> Op
         return None
 
 
-def _db_run_to_response(run: models.Run, db: Optional[Session] = None) -> RunStatusResponse:
+def _latest_rendered_docs(db: Session, runs: List[models.Run]) -> Dict[UUID, models.Artifact]:
+    """Fetch the newest rendered_doc artifact for each successful run in one query."""
+    run_ids = [run.id for run in runs if run.status == "success"]
+    if not run_ids:
+        return {}
+    artifacts = (
+        db.query(models.Artifact)
+        .filter(models.Artifact.run_id.in_(run_ids), models.Artifact.kind == "rendered_doc")
+        .order_by(models.Artifact.created_at.asc())
+        .all()
+    )
+    # Ascending order, so later (newer) artifacts overwrite older ones
+    return {artifact.run_id: artifact for artifact in artifacts}
+
+
+def _included_files(db: Session, run: models.Run) -> Dict[str, models.ProjectFile]:
+    """Load a run's included project files in one query, keyed by id string."""
+    file_ids = [link.file_id for link in run.included_file_links]
+    if not file_ids:
+        return {}
+    files = db.query(models.ProjectFile).filter(models.ProjectFile.id.in_(file_ids)).all()
+    return {str(project_file.id): project_file for project_file in files}
+
+
+def _db_run_to_response(
+    run: models.Run,
+    db: Optional[Session] = None,
+    rendered_docs: Optional[Dict[UUID, models.Artifact]] = None,
+) -> RunStatusResponse:
     # Try to get google doc URL from the rendered_doc artifact
     google_doc_url = None
     google_doc_id = None
     document_title = None
     artifact = None
     
-    if db and run.status == "success":
-        artifact = (
-            db.query(models.Artifact)
-            .filter(models.Artifact.run_id == run.id, models.Artifact.kind == "rendered_doc")
-            .order_by(models.Artifact.created_at.desc())
-            .first()
-        )
+    if run.status == "success" and (db or rendered_docs is not None):
+        if rendered_docs is not None:
+            artifact = rendered_docs.get(run.id)
+        else:
+            artifact = (
+                db.query(models.Artifact)
+                .filter(models.Artifact.run_id == run.id, models.Artifact.kind == "rendered_doc")
+                .order_by(models.Artifact.created_at.desc())
+                .first()
+            )
         if artifact:
             if artifact.meta:
                 google_doc_url = artifact.meta.get("google_doc_url")
@@ -286,8 +317,9 @@ async def list_runs(
             .order_by(models.Run.created_at.desc())
             .all()
         )
+        rendered_docs = _latest_rendered_docs(db, db_runs)
         for run in db_runs:
-            response = _db_run_to_response(run, db)
+            response = _db_run_to_response(run, db, rendered_docs)
             job = job_map.pop(run.id, None)
             if job is not None:
                 live = _job_to_response(job)
@@ -767,14 +799,14 @@ async def check_run_ambiguity(
 
     # Create a step record for the ambiguity check
     from uuid import uuid4
-    from datetime import datetime as dt
+    from datetime import datetime as dt, timezone
     step_id = uuid4()
     step = models.RunStep(
         id=step_id,
         run_id=run_id,
         name="Check Ambiguity",
         status="running",
-        started_at=dt.utcnow(),
+        started_at=dt.now(timezone.utc),
     )
     db.add(step)
     db.commit()
@@ -786,13 +818,13 @@ async def check_run_ambiguity(
         
         # Mark step as success
         step.status = "success"
-        step.finished_at = dt.utcnow()
+        step.finished_at = dt.now(timezone.utc)
         db.add(step)
         db.commit()
     except Exception as exc:
         # Mark step as failed
         step.status = "failed"
-        step.finished_at = dt.utcnow()
+        step.finished_at = dt.now(timezone.utc)
         step.logs = str(exc)
         db.add(step)
         db.commit()
@@ -1213,6 +1245,7 @@ async def index_run_documents(
             # Load specific version
             version = (
                 db.query(models.RunVersion)
+                .options(undefer_group("content"))
                 .filter(
                     models.RunVersion.run_id == run_id,
                     models.RunVersion.version_number == version_number
@@ -1243,27 +1276,22 @@ async def index_run_documents(
         if document_content:
             # Use proper chunking with size limits
             chunks = _chunk_text(document_content)
+            embeddings = embedder.embed_many(chunks)
             
-            for i, chunk in enumerate(chunks):
-                # Get embedding
-                embedding = list(embedder.embed(chunk))
-                
-                # Store embedding with doc_type metadata
-                vector_store.upsert_run_embedding(
-                    embedding=embedding,
-                    project_id=run.project_id,
-                    run_id=run_id,
-                    version_number=version_number or 1.0,
-                    doc_kind="document_chunk",
-                    chunk_index=i,
-                    chunk_text=chunk,
-                    metadata={
-                        "doc_type": "output",
-                        "file_name": "scope_document",
-                    }
-                )
-                indexed_count += 1
-                output_chunks += 1
+            # Store all chunk embeddings with doc_type metadata in one COPY
+            output_chunks = vector_store.insert_run_embeddings(
+                embeddings=embeddings,
+                chunks=chunks,
+                project_id=run.project_id,
+                run_id=run_id,
+                version_number=version_number or 1.0,
+                doc_kind="document_chunk",
+                metadata={
+                    "doc_type": "output",
+                    "file_name": "scope_document",
+                },
+            )
+            indexed_count += output_chunks
         
         # Index input files
         input_chunks = 0
@@ -1276,11 +1304,11 @@ async def index_run_documents(
             
             # Get project base directory for resolving relative paths
             project_base_dir = get_project_data_dir(str(run.project_id))
+            files_by_id = _included_files(db, run)
             
             for file_id in input_file_ids:
                 try:
-                    # Get the project file
-                    project_file = db.get(models.ProjectFile, file_id)
+                    project_file = files_by_id.get(file_id)
                     if not project_file or not project_file.path:
                         logger.warning(f"ProjectFile {file_id} not found or has no path")
                         continue
@@ -1309,25 +1337,22 @@ async def index_run_documents(
                     
                     # Use proper chunking with size limits
                     chunks = _chunk_text(text_content)
-                    
-                    for i, chunk in enumerate(chunks):
-                        embedding = list(embedder.embed(chunk))
-                        vector_store.upsert_run_embedding(
-                            embedding=embedding,
-                            project_id=run.project_id,
-                            run_id=run_id,
-                            version_number=None,  # Input files don't have versions
-                            doc_kind="input_chunk",
-                            chunk_index=i,
-                            chunk_text=chunk,
-                            metadata={
-                                "doc_type": "input",
-                                "file_name": project_file.filename,
-                                "file_id": str(file_id),
-                            }
-                        )
-                        indexed_count += 1
-                        input_chunks += 1
+                    embeddings = embedder.embed_many(chunks)
+                    stored = vector_store.insert_run_embeddings(
+                        embeddings=embeddings,
+                        chunks=chunks,
+                        project_id=run.project_id,
+                        run_id=run_id,
+                        version_number=None,  # Input files don't have versions
+                        doc_kind="input_chunk",
+                        metadata={
+                            "doc_type": "input",
+                            "file_name": project_file.filename,
+                            "file_id": str(file_id),
+                        },
+                    )
+                    indexed_count += stored
+                    input_chunks += stored
                         
                 except Exception as file_exc:
                     logger.exception(f"Failed to index input file {file_id}: {file_exc}")
@@ -1447,6 +1472,7 @@ async def index_run_documents_stream(
             if version_number:
                 version = (
                     db.query(models.RunVersion)
+                    .options(undefer_group("content"))
                     .filter(
                         models.RunVersion.run_id == run_id,
                         models.RunVersion.version_number == version_number
@@ -1484,10 +1510,11 @@ async def index_run_documents_stream(
                 from server.core.ingest import DocumentIngester
                 ingester = DocumentIngester()
                 project_base_dir = get_project_data_dir(str(run.project_id))
+                files_by_id = _included_files(db, run)
                 
                 for file_id in input_file_ids:
                     try:
-                        project_file = db.get(models.ProjectFile, file_id)
+                        project_file = files_by_id.get(file_id)
                         if not project_file or not project_file.path:
                             logger.warning(f"ProjectFile {file_id} not found or has no path")
                             continue
@@ -1539,25 +1566,23 @@ async def index_run_documents_stream(
                 batch = output_chunk_list[batch_start:batch_start + BATCH_SIZE]
                 
                 # Batch embed
-                embeddings = await run_in_threadpool(lambda b=batch: [list(embedder.embed(c)) for c in b])
+                embeddings = await run_in_threadpool(embedder.embed_many, batch)
                 
-                # Store all embeddings in batch
-                for i, (chunk, embedding) in enumerate(zip(batch, embeddings)):
-                    chunk_idx = batch_start + i
-                    await run_in_threadpool(
-                        lambda emb=embedding, idx=chunk_idx, chk=chunk: vector_store.upsert_run_embedding(
-                            embedding=emb,
-                            project_id=run.project_id,
-                            run_id=run_id,
-                            version_number=version_number or 1.0,
-                            doc_kind="document_chunk",
-                            chunk_index=idx,
-                            chunk_text=chk,
-                            metadata={"doc_type": "output", "file_name": "scope_document"}
-                        )
+                # Store all embeddings in batch with one COPY
+                stored = await run_in_threadpool(
+                    lambda b=batch, embs=embeddings, start=batch_start: vector_store.insert_run_embeddings(
+                        embeddings=embs,
+                        chunks=b,
+                        project_id=run.project_id,
+                        run_id=run_id,
+                        version_number=version_number or 1.0,
+                        doc_kind="document_chunk",
+                        start_index=start,
+                        metadata={"doc_type": "output", "file_name": "scope_document"},
                     )
-                    indexed_count += 1
-                    output_chunks += 1
+                )
+                indexed_count += stored
+                output_chunks += stored
                 
                 # Send progress after each batch
                 progress = int((indexed_count / total_chunks) * 100) if total_chunks > 0 else 100
@@ -1571,25 +1596,23 @@ async def index_run_documents_stream(
                     batch = file_chunks[batch_start:batch_start + BATCH_SIZE]
                     
                     # Batch embed
-                    embeddings = await run_in_threadpool(lambda b=batch: [list(embedder.embed(c)) for c in b])
+                    embeddings = await run_in_threadpool(embedder.embed_many, batch)
                     
-                    # Store all embeddings in batch
-                    for i, (chunk, embedding) in enumerate(zip(batch, embeddings)):
-                        chunk_idx = batch_start + i
-                        await run_in_threadpool(
-                            lambda emb=embedding, idx=chunk_idx, chk=chunk, fd=file_data: vector_store.upsert_run_embedding(
-                                embedding=emb,
-                                project_id=run.project_id,
-                                run_id=run_id,
-                                version_number=None,
-                                doc_kind="input_chunk",
-                                chunk_index=idx,
-                                chunk_text=chk,
-                                metadata={"doc_type": "input", "file_name": fd["filename"], "file_id": str(fd["file_id"])}
-                            )
+                    # Store all embeddings in batch with one COPY
+                    stored = await run_in_threadpool(
+                        lambda b=batch, embs=embeddings, start=batch_start, fd=file_data: vector_store.insert_run_embeddings(
+                            embeddings=embs,
+                            chunks=b,
+                            project_id=run.project_id,
+                            run_id=run_id,
+                            version_number=None,
+                            doc_kind="input_chunk",
+                            start_index=start,
+                            metadata={"doc_type": "input", "file_name": fd["filename"], "file_id": str(fd["file_id"])},
                         )
-                        indexed_count += 1
-                        input_chunks += 1
+                    )
+                    indexed_count += stored
+                    input_chunks += stored
                     
                     # Send progress after each batch
                     progress = int((indexed_count / total_chunks) * 100) if total_chunks > 0 else 100
@@ -1681,6 +1704,7 @@ async def download_run_docx(
     if version and version > 1:
         run_version = (
             db.query(models.RunVersion)
+            .options(undefer_group("content"))
             .filter(models.RunVersion.run_id == run_id, models.RunVersion.version_number == version)
             .first()
         )
@@ -1749,6 +1773,7 @@ async def download_run_md(
     if version and version > 1:
         run_version = (
             db.query(models.RunVersion)
+            .options(undefer_group("content"))
             .filter(models.RunVersion.run_id == run_id, models.RunVersion.version_number == version)
             .first()
         )
@@ -2046,6 +2071,7 @@ async def export_run_google_doc(
     if version is not None:
         run_version = (
             db.query(models.RunVersion)
+            .options(undefer_group("content"))
             .filter(models.RunVersion.run_id == run_id, models.RunVersion.version_number == version)
             .first()
         )
@@ -2238,6 +2264,7 @@ async def list_run_versions(
     
     versions = (
         db.query(models.RunVersion)
+        .options(undefer_group("content"))
         .filter(models.RunVersion.run_id == run_id)
         .order_by(models.RunVersion.version_number.desc())
         .all()
@@ -2278,6 +2305,7 @@ async def get_run_version(
     
     version = (
         db.query(models.RunVersion)
+        .options(undefer_group("content"))
         .filter(
             models.RunVersion.run_id == run_id,
             models.RunVersion.version_number == version_number
@@ -2446,6 +2474,7 @@ async def chat_with_run(
         if payload.version and payload.version > 1:
             run_version = (
                 db.query(models.RunVersion)
+                .options(undefer_group("content"))
                 .filter(
                     models.RunVersion.run_id == run_id,
                     models.RunVersion.version_number == payload.version
@@ -545,8 +545,8 @@ Be concise and helpful. Focus on improving the document quality."""
             if not PERPLEXITY_API_KEY:
                 return "Deep research is not available (Perplexity API key not configured)"
             try:
-                client = PerplexityClient(PERPLEXITY_API_KEY)
-                finding = client.query(query)
+                with PerplexityClient(PERPLEXITY_API_KEY) as client:
+                    finding = client.query(query)
                 if finding:
                     result = f"Research findings for: {query}\n\n{finding.content}"
                     if finding.sources:
@@ -642,11 +642,7 @@ Be concise and helpful. Focus on improving the document quality."""
                     if not input_file_ids:
                         return "No input files available for this run"
                     
-                    files = []
-                    for file_id in input_file_ids:
-                        pf = db.get(models.ProjectFile, file_id)
-                        if pf:
-                            files.append(pf.filename)
+                    files = [pf.filename for pf in run.included_files]
                     
                     if not files:
                         return "No input files found"
@@ -686,19 +682,15 @@ Be concise and helpful. Focus on improving the document quality."""
                         return "No input files available for this run"
                     
                     project_file = None
-                    for file_id in input_file_ids:
-                        pf = db.get(models.ProjectFile, file_id)
-                        if pf and (pf.filename.lower() == filename.lower() or filename.lower() in pf.filename.lower()):
+                    input_files = run.included_files
+                    for pf in input_files:
+                        if pf.filename.lower() == filename.lower() or filename.lower() in pf.filename.lower():
                             project_file = pf
                             break
                     
                     if not project_file:
                         # List available files
-                        available = []
-                        for file_id in input_file_ids:
-                            pf = db.get(models.ProjectFile, file_id)
-                            if pf:
-                                available.append(pf.filename)
+                        available = [pf.filename for pf in input_files]
                         return f"File '{filename}' not found. Available files: {', '.join(available)}"
                     
                     # Get full path and read content
@@ -770,8 +762,8 @@ Be concise and helpful. Focus on improving the document quality."""
             return None
 
         try:
-            client = PerplexityClient(PERPLEXITY_API_KEY)
-            return client.query(query)
+            with PerplexityClient(PERPLEXITY_API_KEY) as client:
+                return client.query(query)
         except Exception as exc:
             logger.exception(f"Deep research failed: {exc}")
             return None
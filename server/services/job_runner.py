@@ -7,13 +7,15 @@ import json
 import logging
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 import shutil
 from pathlib import Path
 from threading import Lock
 from typing import Dict, Optional, List, Tuple
 from uuid import UUID, uuid4
 
+from sqlalchemy.orm import undefer_group
+
 from server.core.main import ScopeDocGenerator
 from server.core.research import ResearchMode
 from server.core.config import (
@@ -27,8 +29,9 @@ from server.core.history_profiles import ProfileEmbedder
 from server.core.history_retrieval import HistoryRetriever
 
 from ..storage import ensure_project_structure
-from ..db.session import get_session
+from ..db.session import get_session, retry_on_disconnect
 from ..db import models
+from ..db.fast_updates import finish_run_step, update_run
 from ..dependencies import get_storage
 from .vector_store import VectorStore
 
@@ -92,7 +95,7 @@ class JobStatus:
     research_mode: str
     template_type: Optional[str] = None
     status: str = JobState.PENDING
-    created_at: datetime = field(default_factory=datetime.utcnow)
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     started_at: Optional[datetime] = None
     finished_at: Optional[datetime] = None
     result_path: Optional[str] = None
@@ -122,7 +125,7 @@ class RegenJobStatus:
     id: UUID
     run_id: UUID
     status: str = JobState.PENDING
-    created_at: datetime = field(default_factory=datetime.utcnow)
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     started_at: Optional[datetime] = None
     finished_at: Optional[datetime] = None
     version_id: Optional[UUID] = None
@@ -298,7 +301,7 @@ class JobRegistry:
             job = self._regen_jobs.get(job_id)
             if job:
                 job.status = JobState.RUNNING
-                job.started_at = datetime.utcnow()
+                job.started_at = datetime.now(timezone.utc)
         
         # Determine version number first for the step name
         next_version_number = 2
@@ -313,6 +316,7 @@ class JobRegistry:
                 # Get current version number
                 latest_version = (
                     session.query(models.RunVersion)
+                    .options(undefer_group("content"))
                     .filter(models.RunVersion.run_id == run_id)
                     .order_by(models.RunVersion.version_number.desc())
                     .first()
@@ -443,7 +447,7 @@ class JobRegistry:
                     job = self._regen_jobs.get(job_id)
                     if job:
                         job.status = JobState.SUCCESS
-                        job.finished_at = datetime.utcnow()
+                        job.finished_at = datetime.now(timezone.utc)
                         job.version_id = new_version.id
                         job.version_number = next_version_number
                 
@@ -458,7 +462,7 @@ class JobRegistry:
                 job = self._regen_jobs.get(job_id)
                 if job:
                     job.status = JobState.FAILED
-                    job.finished_at = datetime.utcnow()
+                    job.finished_at = datetime.now(timezone.utc)
                     job.error = str(exc)
 
     # ---------- End Regen Job Methods ----------
@@ -478,7 +482,7 @@ class JobRegistry:
             run_record.template_type = template_type
             run_record.status = JobState.PENDING
             run_record.params = options.to_dict()
-            run_record.included_file_ids = options.included_file_ids
+            self._link_included_files(session, run_record, options.included_file_ids)
             run_record.instructions = options.instructions_override
 
             if options.parent_run_id:
@@ -489,6 +493,30 @@ class JobRegistry:
             else:
                 run_record.parent_run_id = None
 
+    @staticmethod
+    def _link_included_files(session, run_record: models.Run, included_ids: List[str]) -> None:
+        wanted = set()
+        for fid in included_ids:
+            try:
+                wanted.add(UUID(fid))
+            except ValueError:
+                LOGGER.warning("Ignoring invalid included file id %s", fid)
+        if wanted:
+            # Only link files that exist in this run's project
+            rows = (
+                session.query(models.ProjectFile.id)
+                .filter(
+                    models.ProjectFile.project_id == run_record.project_id,
+                    models.ProjectFile.id.in_(wanted),
+                )
+                .all()
+            )
+            wanted = {row.id for row in rows}
+        links = [link for link in run_record.included_file_links if link.file_id in wanted]
+        linked = {link.file_id for link in links}
+        links.extend(models.RunIncludedFile(file_id=fid) for fid in wanted - linked)
+        run_record.included_file_links = links
+
     # ------------------------------------------------------------------
     # Worker
     # ------------------------------------------------------------------
@@ -512,7 +540,7 @@ class JobRegistry:
             LOGGER.exception(f"Job {job_id} failed during sync: {exc}")
             self._finish_run_step(sync_step_id, "failed", str(exc))
             self._mark_failed(job, str(exc))
-            self._update_run(job.id, status=JobState.FAILED, finished_at=datetime.utcnow(), error=str(exc))
+            self._update_run(job.id, status=JobState.FAILED, finished_at=datetime.now(timezone.utc), error=str(exc))
             return
 
         if sync_errors:
@@ -522,7 +550,7 @@ class JobRegistry:
             self._update_run(
                 job.id,
                 status=JobState.FAILED,
-                finished_at=datetime.utcnow(),
+                finished_at=datetime.now(timezone.utc),
                 error=detail,
             )
             return
@@ -555,7 +583,7 @@ class JobRegistry:
         # No need to write instructions.txt file
         
         self._mark_running(job)
-        self._update_run(job.id, status=JobState.RUNNING, started_at=datetime.utcnow())
+        self._update_run(job.id, status=JobState.RUNNING, started_at=datetime.now(timezone.utc))
         
         LOGGER.info(f"Starting job {job_id} in {options.run_mode} mode")
         LOGGER.info(f"Job options: research_mode={options.research_mode}, enable_vector_store={options.enable_vector_store}, enable_web_search={options.enable_web_search}")
@@ -632,7 +660,7 @@ class JobRegistry:
             # Mark in-memory status first so live queries see completion immediately
             self._mark_success(job, result_rel)
             self._update_run(job.id, params=job.params)
-            self._update_run(job.id, status=JobState.SUCCESS, finished_at=datetime.utcnow(), result_path=result_rel)
+            self._update_run(job.id, status=JobState.SUCCESS, finished_at=datetime.now(timezone.utc), result_path=result_rel)
             artifact_ids = self._record_artifacts(job.id, job.project_id, paths, result_rel)
             variables_artifact_id = artifact_ids.get("variables")
             if variables_artifact_id:
@@ -646,23 +674,23 @@ class JobRegistry:
         except Exception as exc:  # pragma: no cover - execution safeguard
             LOGGER.exception(f"Job {job_id} failed: {exc}")
             self._mark_failed(job, str(exc))
-            self._update_run(job.id, status=JobState.FAILED, finished_at=datetime.utcnow(), error=str(exc))
+            self._update_run(job.id, status=JobState.FAILED, finished_at=datetime.now(timezone.utc), error=str(exc))
 
     def _mark_running(self, job: JobStatus) -> None:
         with self._lock:
             job.status = JobState.RUNNING
-            job.started_at = datetime.utcnow()
+            job.started_at = datetime.now(timezone.utc)
 
     def _mark_success(self, job: JobStatus, result_path: Optional[str]) -> None:
         with self._lock:
             job.status = JobState.SUCCESS
-            job.finished_at = datetime.utcnow()
+            job.finished_at = datetime.now(timezone.utc)
             job.result_path = result_path
 
     def _mark_failed(self, job: JobStatus, error: str) -> None:
         with self._lock:
             job.status = JobState.FAILED
-            job.finished_at = datetime.utcnow()
+            job.finished_at = datetime.now(timezone.utc)
             job.error = error
 
     def _auto_generate_questions(self, job: JobStatus, paths, result_rel: Optional[str]) -> None:
@@ -704,14 +732,12 @@ class JobRegistry:
             LOGGER.exception(f"Auto question generation failed for job {job.id}: {exc}")
             self._finish_run_step(step_id, "failed", str(exc))
 
+    @retry_on_disconnect
     def _update_run(self, run_id: UUID, **updates) -> None:
         with get_session() as session:
-            run = session.get(models.Run, run_id)
-            if not run:
-                return
-            for key, value in updates.items():
-                setattr(run, key, value)
+            update_run(session, run_id, **updates)
 
+    @retry_on_disconnect
     def _start_run_step(self, run_id: UUID, name: str) -> UUID:
         step_id = uuid4()
         with get_session() as session:
@@ -720,20 +746,15 @@ class JobRegistry:
                 run_id=run_id,
                 name=name,
                 status=JobState.RUNNING,
-                started_at=datetime.utcnow(),
+                started_at=datetime.now(timezone.utc),
             )
             session.add(step)
         return step_id
 
+    @retry_on_disconnect
     def _finish_run_step(self, step_id: UUID, status: str, logs: Optional[str] = None) -> None:
         with get_session() as session:
-            step = session.get(models.RunStep, step_id)
-            if not step:
-                return
-            step.status = status
-            step.finished_at = datetime.utcnow()
-            if logs:
-                step.logs = logs
+            finish_run_step(session, step_id, status, datetime.now(timezone.utc), logs)
 
     def _run_quick_regen(
         self,
@@ -814,7 +835,7 @@ class JobRegistry:
             emit("adjust_variables", "completed", "No changes requested")
 
         try:
-            updated_variables['date_created'] = datetime.utcnow().date().isoformat()
+            updated_variables['date_created'] = datetime.now(timezone.utc).date().isoformat()
         except Exception:
             pass
 
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import base64
 import logging
-from typing import Iterable, Mapping
+from typing import Iterable, Mapping, Optional
 
 import httpx
 
@@ -21,6 +21,27 @@ class TokenCountingError(RuntimeError):
     """Raised when the Claude token counting API fails."""
 
 
+# One client per process so uploads reuse pooled TLS connections to the API.
+# Only awaited from the app's event loop.
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(timeout=httpx.Timeout(30.0, connect=10.0))
+    return _client
+
+
+async def aclose_client() -> None:
+    """Close the shared HTTP client; called on application shutdown."""
+
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
 def make_text_block(text: str) -> Mapping[str, str]:
     """Create a token counting block for plain text."""
 
@@ -88,8 +109,7 @@ async def count_tokens_for_blocks(blocks: Iterable[Mapping[str, object]]) -> int
     }
 
     try:
-        async with httpx.AsyncClient(timeout=httpx.Timeout(30.0, connect=10.0)) as client:
-            response = await client.post(COUNT_TOKENS_URL, headers=headers, json=payload)
+        response = await _get_client().post(COUNT_TOKENS_URL, headers=headers, json=payload)
     except httpx.HTTPError as exc:
         LOGGER.error("Token counting request failed: %s", exc)
         raise TokenCountingError("Token counting request failed") from exc
@@ -8,14 +8,19 @@ from typing import Iterable, List, Optional, Sequence
 from uuid import UUID, uuid4
 from contextlib import contextmanager
 
-from pgvector.psycopg import Vector, register_vector
-from psycopg.types.json import Json
+from pgvector import HalfVector
+from pgvector.psycopg import register_vector
+from psycopg.types.json import Json, Jsonb
 from psycopg.rows import dict_row
 from sqlalchemy.engine import Engine
 
 
 logger = logging.getLogger(__name__)
 
+# Embeddings are stored as half precision; pgvector's HNSW index supports
+# `halfvec` columns of up to 4000 dimensions
+_HNSW_MAX_DIM = 4000
+
 
 class VectorStoreError(RuntimeError):
     """Raised when vector store operations fail."""
@@ -43,6 +48,7 @@ class VectorStore:
         engine: Engine,
         *,
         embedding_dim: int = 1536,
+        ensure_schema_on_use: bool = False,
     ) -> None:
         """
         Initialize VectorStore.
@@ -50,13 +56,15 @@ class VectorStore:
         Args:
             engine: SQLAlchemy Engine (must be provided - uses shared connection pool)
             embedding_dim: Dimension of embedding vectors
+            ensure_schema_on_use: Run the CREATE ... IF NOT EXISTS bootstrap before the
+                first operation. Off by default: `alembic upgrade head` owns the schema.
         """
         if not isinstance(engine, Engine):
             raise ValueError("VectorStore requires a SQLAlchemy Engine instance")
         
         self.engine = engine
         self.embedding_dim = embedding_dim
-        self._schema_ensured = False  # Track if schema has been created
+        self._schema_ensured = not ensure_schema_on_use  # Track if schema has been created
         logger.info("VectorStore initialized using SQLAlchemy connection pool (shared with app)")
 
     @contextmanager
@@ -73,7 +81,12 @@ class VectorStore:
             conn_proxy = self.engine.raw_connection()
             # Access the actual DBAPI connection underneath
             dbapi_conn = conn_proxy.connection
-            register_vector(dbapi_conn)  # Enable pgvector support on the real connection
+            # Enable pgvector's binary dumpers/loaders on the real connection. The
+            # registration costs a catalog round trip per type and the adapters
+            # persist on the DBAPI connection, so only do it once per pooled connection.
+            if not conn_proxy.info.get("pgvector_registered"):
+                register_vector(dbapi_conn)
+                conn_proxy.info["pgvector_registered"] = True
             # Save and set row_factory to return dict-like rows for column name access
             original_row_factory = dbapi_conn.row_factory
             dbapi_conn.row_factory = dict_row
@@ -131,7 +144,7 @@ class VectorStore:
                 id UUID PRIMARY KEY,
                 project_id UUID,
                 doc_kind TEXT NOT NULL,
-                embedding vector({self.embedding_dim}) NOT NULL,
+                embedding halfvec({self.embedding_dim}) NOT NULL,
                 metadata JSONB,
                 created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
             )
@@ -141,11 +154,26 @@ class VectorStore:
                 ON scope_embeddings (project_id)
             """,
             """
-            CREATE INDEX IF NOT EXISTS idx_scope_embeddings_embedding
-                ON scope_embeddings USING ivfflat (embedding vector_cosine_ops)
-                WITH (lists = 100)
+            CREATE INDEX IF NOT EXISTS ix_scope_embeddings_run_id
+                ON scope_embeddings ((metadata->>'run_id'))
             """,
         ]
+        if self.embedding_dim <= _HNSW_MAX_DIM:
+            # HNSW needs no training data, unlike ivfflat whose lists are fixed
+            # from whatever rows exist when the index is built.
+            statements.append(
+                """
+                CREATE INDEX IF NOT EXISTS ix_scope_embeddings_hnsw
+                    ON scope_embeddings USING hnsw (embedding halfvec_cosine_ops)
+                    WITH (m = 16, ef_construction = 64)
+                """
+            )
+        else:
+            logger.warning(
+                "Embedding dimension %s exceeds HNSW limit (%s); similarity search will scan",
+                self.embedding_dim,
+                _HNSW_MAX_DIM,
+            )
 
         with self._connect() as conn:
             with conn.cursor() as cur:
@@ -195,7 +223,7 @@ class VectorStore:
                             embedding_id,
                             project_id,
                             doc_kind,
-                            Vector(list(embedding)),
+                            HalfVector(list(embedding)),
                             Json(metadata) if metadata else None,
                         ),
                     )
@@ -252,7 +280,7 @@ class VectorStore:
                             embedding_id,
                             project_id,
                             doc_kind,
-                            Vector(list(embedding)),
+                            HalfVector(list(embedding)),
                             Json(full_metadata),
                         ),
                     )
@@ -264,6 +292,55 @@ class VectorStore:
 
         return embedding_id
 
+    def insert_run_embeddings(
+        self,
+        *,
+        embeddings: Sequence[Sequence[float]],
+        chunks: Sequence[str],
+        project_id: Optional[UUID],
+        run_id: UUID,
+        version_number: Optional[float],
+        doc_kind: str,
+        start_index: int = 0,
+        metadata: Optional[dict] = None,
+    ) -> int:
+        """Bulk-insert fresh chunk embeddings for a run with a single binary COPY.
+
+        Unlike upsert_run_embedding this never overwrites: callers clear the
+        run's embeddings first, and each row gets a new id.
+        """
+        self._ensure_schema_lazy()
+
+        base_metadata = metadata or {}
+        inserted = 0
+        with self._connect() as conn:
+            with conn.cursor() as cur:
+                try:
+                    with cur.copy(
+                        "COPY scope_embeddings (id, project_id, doc_kind, embedding, metadata) "
+                        "FROM STDIN WITH (FORMAT BINARY)"
+                    ) as copy:
+                        copy.set_types(["uuid", "uuid", "text", "halfvec", "jsonb"])
+                        for offset, (embedding, chunk_text) in enumerate(zip(embeddings, chunks)):
+                            row_metadata = {
+                                **base_metadata,
+                                "run_id": str(run_id),
+                                "version_number": version_number,
+                                "chunk_index": start_index + offset,
+                                "chunk_text": chunk_text[:500] if chunk_text else "",
+                            }
+                            copy.write_row(
+                                (uuid4(), project_id, doc_kind, HalfVector(list(embedding)), Jsonb(row_metadata))
+                            )
+                            inserted += 1
+                except Exception as exc:
+                    conn.rollback()
+                    raise VectorStoreError(f"Failed to insert run embeddings: {exc}") from exc
+                else:
+                    conn.commit()
+
+        return inserted
+
     def delete_run_embeddings(self, run_id: UUID) -> int:
         """Delete all embeddings for a specific run."""
         self._ensure_schema_lazy()
@@ -305,9 +382,9 @@ class VectorStore:
             LIMIT %s
         """
         params = [
-            Vector(list(embedding)),
+            HalfVector(list(embedding)),
             str(run_id),
-            Vector(list(embedding)),
+            HalfVector(list(embedding)),
             top_k,
         ]
 
@@ -447,14 +524,14 @@ class VectorStore:
             "       embedding <=> %s AS similarity",
             "FROM scope_embeddings",
         ]
-        params: list = [Vector(list(embedding))]
+        params: list = [HalfVector(list(embedding))]
 
         if project_id:
             query.append("WHERE project_id = %s")
             params.append(project_id)
 
         query.append("ORDER BY embedding <=> %s ASC LIMIT %s")
-        params.append(Vector(list(embedding)))
+        params.append(HalfVector(list(embedding)))
         params.append(top_k)
 
         sql = "\n".join(query)
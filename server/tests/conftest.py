@@ -0,0 +1,12 @@
+"""Shared pytest setup for the server package.
+
+The database layer reads DATABASE_DSN at import time, so an in-memory
+SQLite DSN is provided before any test module imports it. Tests that touch
+the database bind ``SessionLocal`` to their own engine.
+"""
+
+import os
+
+os.environ.setdefault("DATABASE_DSN", "sqlite://")
+# NullPool path: skips the QueuePool sizing and Postgres-only connect args
+os.environ.setdefault("DB_TRANSACTION_POOLER", "1")
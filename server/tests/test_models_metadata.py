@@ -0,0 +1,31 @@
+"""Integrity of the single declarative metadata shared by the app and alembic."""
+
+from server.db import Base, models
+
+EXPECTED_TABLES = {
+    "artifacts",
+    "google_auth",
+    "project_files",
+    "projects",
+    "run_included_files",
+    "run_steps",
+    "run_versions",
+    "runs",
+    "scope_embeddings",
+    "team_members",
+    "teams",
+    "users",
+}
+
+
+def test_metadata_registers_each_table_once() -> None:
+    assert len(Base.metadata.tables) == len(EXPECTED_TABLES)
+    assert set(Base.metadata.tables) == EXPECTED_TABLES
+
+
+def test_models_module_uses_shared_base() -> None:
+    # Every mapped class comes from server.db.models, so no duplicate module
+    # registers its own copy of a table
+    mappers = list(Base.registry.mappers)
+    assert len(mappers) == len(EXPECTED_TABLES)
+    assert {mapper.class_.__module__ for mapper in mappers} == {models.__name__}
@@ -0,0 +1,115 @@
+"""Commit-on-write behaviour of ``get_session`` and ``has_pending_writes``."""
+
+from typing import Iterator
+
+import pytest
+from sqlalchemy import Integer, String, create_engine, insert, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.pool import StaticPool
+
+from server.db.session import SessionLocal, get_session, has_pending_writes
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class Item(_Base):
+    __tablename__ = "items"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(50), nullable=False)
+
+
+@pytest.fixture
+def engine() -> Iterator[Engine]:
+    # One shared in-memory connection; anything not committed is rolled
+    # back when the session closes, so committed rows are all that remain
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    _Base.metadata.create_all(engine)
+    previous_bind = SessionLocal.kw.get("bind")
+    SessionLocal.configure(bind=engine)
+    try:
+        yield engine
+    finally:
+        SessionLocal.configure(bind=previous_bind)
+        engine.dispose()
+
+
+def _names(engine: Engine) -> list:
+    with engine.connect() as conn:
+        return sorted(conn.execute(text("SELECT name FROM items")).scalars())
+
+
+def test_orm_add_is_committed(engine: Engine) -> None:
+    with get_session() as session:
+        session.add(Item(name="added"))
+    assert _names(engine) == ["added"]
+
+
+def test_flushed_add_is_committed(engine: Engine) -> None:
+    with get_session() as session:
+        session.add(Item(name="flushed"))
+        session.flush()
+        assert has_pending_writes(session)
+    assert _names(engine) == ["flushed"]
+
+
+def test_core_insert_is_committed(engine: Engine) -> None:
+    with get_session() as session:
+        session.execute(insert(Item).values(name="core"))
+    assert _names(engine) == ["core"]
+
+
+def test_text_dml_is_committed(engine: Engine) -> None:
+    with get_session() as session:
+        session.execute(text("INSERT INTO items (name) VALUES ('text')"))
+    assert _names(engine) == ["text"]
+
+
+def test_write_after_commit_is_committed(engine: Engine) -> None:
+    with get_session() as session:
+        session.add(Item(name="first"))
+        session.commit()
+        assert not has_pending_writes(session)
+        session.add(Item(name="second"))
+    assert _names(engine) == ["first", "second"]
+
+
+def test_dirty_object_is_committed(engine: Engine) -> None:
+    with get_session() as session:
+        session.add(Item(id=1, name="before"))
+    with get_session() as session:
+        item = session.get(Item, 1)
+        item.name = "after"
+        assert has_pending_writes(session)
+    assert _names(engine) == ["after"]
+
+
+def test_savepoint_write_is_committed(engine: Engine) -> None:
+    with get_session() as session:
+        session.execute(select(Item)).all()
+        with session.begin_nested():
+            session.add(Item(name="nested"))
+        assert has_pending_writes(session)
+    assert _names(engine) == ["nested"]
+
+
+def test_read_only_session_has_no_pending_writes(engine: Engine) -> None:
+    with get_session() as session:
+        session.execute(select(Item)).all()
+        assert not has_pending_writes(session)
+
+
+def test_error_rolls_back(engine: Engine) -> None:
+    with pytest.raises(RuntimeError):
+        with get_session() as session:
+            session.add(Item(name="discarded"))
+            session.flush()
+            raise RuntimeError("boom")
+    assert _names(engine) == []